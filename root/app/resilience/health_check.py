@@ -161,29 +161,15 @@ class HealthChecker:
         Returns:
             Dictionary of service name to health information
         """
-        results = {}
-        
-        # Run all checks concurrently
-        tasks = [
-            self.check_service(service_name, force)
-            for service_name in self._check_functions.keys()
-        ]
-        
-        if tasks:
-            health_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for i, result in enumerate(health_results):
-                service_name = list(self._check_functions.keys())[i]
-                if isinstance(result, Exception):
-                    results[service_name] = ServiceHealth(
-                        service_name=service_name,
-                        status=HealthStatus.UNHEALTHY,
-                        error_message=str(result)
-                    )
-                else:
-                    results[service_name] = result
+        # Run all checks concurrently; check_service converts check failures
+        # into UNHEALTHY results, so no exception escapes to cancel siblings
+        async with asyncio.TaskGroup() as tg:
+            tasks = {
+                service_name: tg.create_task(self.check_service(service_name, force))
+                for service_name in self._check_functions
+            }
         
-        return results
+        return {service_name: task.result() for service_name, task in tasks.items()}
     
     def get_cached_health(self, service_name: str) -> Optional[ServiceHealth]:
         """Get cached health information for a service.
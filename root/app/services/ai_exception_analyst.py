@@ -37,6 +37,9 @@ CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
 CIRCUIT_BREAKER_TIMEOUT = 300  # 5 minutes
 CIRCUIT_BREAKER_KEY = "ai_circuit_breaker"
 
+# Ops note sections in display order
+OPS_NOTE_SECTION_TAGS = ("ROOT CAUSE", "ANALYSIS", "RECOMMENDATIONS", "PRIORITY FACTORS")
+
 
 class AICircuitBreaker:
     """Circuit breaker for AI service calls."""
@@ -448,32 +451,19 @@ async def _apply_ai_analysis(
     # Set confidence score
     exception.ai_confidence = ai_result.get("confidence", 0.0)
     
-    # Build enhanced ops note with root cause analysis
-    ops_note_parts = []
-    
-    # Add root cause analysis if available
-    root_cause = ai_result.get("root_cause_analysis", "")
-    if root_cause:
-        ops_note_parts.append(f"[ROOT CAUSE] {root_cause}")
-    
-    # Add original ops note
-    ops_note = ai_result.get("ops_note", "")
-    if ops_note:
-        ops_note_parts.append(f"[ANALYSIS] {ops_note}")
-    
-    # Add recommendations if available
-    recommendations = ai_result.get("recommendations", "")
-    if recommendations:
-        ops_note_parts.append(f"[RECOMMENDATIONS] {recommendations}")
-    
-    # Add priority factors if available
+    # Build enhanced ops note with root cause analysis, skipping empty sections
     priority_factors = ai_result.get("priority_factors", [])
-    if priority_factors:
-        factors_str = ", ".join(priority_factors)
-        ops_note_parts.append(f"[PRIORITY FACTORS] {factors_str}")
-    
-    # Combine all parts
-    combined_ops_note = "\n\n".join(ops_note_parts)
+    section_values = (
+        ai_result.get("root_cause_analysis", ""),
+        ai_result.get("ops_note", ""),
+        ai_result.get("recommendations", ""),
+        ", ".join(priority_factors) if priority_factors else ""
+    )
+    combined_ops_note = "\n\n".join(
+        f"[{tag}] {value}"
+        for tag, value in zip(OPS_NOTE_SECTION_TAGS, section_values)
+        if value
+    )
     exception.ops_note = combined_ops_note[:2000]  # Truncate if too long
     
     # Set client note
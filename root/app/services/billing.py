@@ -8,17 +8,67 @@ invoice validation, amount calculations, adjustment processing,
 and detailed billing summaries with tenant-specific configurations.
 """
 
-from typing import Dict, Any, Optional
+import json
+import operator
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Mapping, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select, text
 
 from app.services.policy_loader import get_billing_config
+from app.observability.metrics import (
+    invoice_adjustments_total,
+    invoice_adjustment_amount_cents
+)
 from app.observability.tracing import get_tracer
 from app.storage.models import Invoice, InvoiceAdjustment, OrderEvent
 
 
 tracer = get_tracer(__name__)
 
+# Core per-unit operations: (operation key, tariff key, default rate in cents)
+_CORE_FEE_SPECS = (
+    ("pick", "pick_fee_cents", 30),
+    ("pack", "pack_fee_cents", 20),
+    ("label", "label_fee_cents", 15),
+    ("kitting", "kitting_fee_cents", 50),
+)
+
+# Special-handling surcharges: (operation flag, tariff key, default multiplier)
+_MULTIPLIER_SPECS = (
+    ("rush", "rush_multiplier", 2.0),
+    ("oversized", "oversized_multiplier", 1.5),
+    ("hazmat", "hazmat_multiplier", 3.0),
+    ("fragile", "fragile_multiplier", 1.2),
+)
+
+
+# Fused fetch + recalculate + insert for DRAFT invoices whose billed amount
+# no longer matches the tariff (compute_expected_amount, migration 006)
+_TARIFF_ADJUSTMENT_SQL = text("""
+    INSERT INTO invoice_adjustments
+        (invoice_id, tenant, reason, delta_cents, rationale,
+         ai_generated, created_at, created_by)
+    SELECT i.id, i.tenant, 'RECALCULATION', e.expected - i.amount_cents,
+           'Recalculated amount based on actual operations. Expected: $'
+               || to_char(e.expected / 100.0, 'FM999999990.00')
+               || ', Original: $'
+               || to_char(i.amount_cents / 100.0, 'FM999999990.00'),
+           false, now() AT TIME ZONE 'UTC', 'system'
+    FROM invoices i
+    CROSS JOIN LATERAL (
+        SELECT compute_expected_amount(i.billable_ops::jsonb, CAST(:cfg AS jsonb)) AS expected
+    ) e
+    WHERE i.tenant = :tenant
+      AND i.status = 'DRAFT'
+      AND e.expected != i.amount_cents
+      AND NOT EXISTS (
+          SELECT 1 FROM invoice_adjustments a WHERE a.invoice_id = i.id
+      )
+    RETURNING tenant, reason, delta_cents
+""")
+
 
 # ==== BILLING SERVICE CLASS ==== #
 
@@ -62,10 +112,42 @@ class BillingService:
         Returns:
             Optional[InvoiceAdjustment]: Invoice adjustment if needed, None otherwise
         """
+        discrepancy = await self.calculate_invoice_adjustment(db, invoice)
+        if discrepancy is None:
+            return None
+        
+        # Create adjustment record
+        adjustment = InvoiceAdjustment(**self.build_adjustment_row(discrepancy))
+        
+        db.add(adjustment)
+        await db.flush()
+        
+        return adjustment
+    
+    async def calculate_invoice_adjustment(
+        self, 
+        db: AsyncSession, 
+        invoice: Invoice
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Recalculate an invoice and return its discrepancy without persisting.
+        
+        Lets batch callers collect discrepancies and write them with a
+        single bulk INSERT instead of one ORM flush per invoice; see
+        build_adjustment_row for the persisted column values.
+        
+        Args:
+            db (AsyncSession): Database session for data access
+            invoice (Invoice): Invoice record (or row with the same attributes)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Discrepancy if the amounts differ, None otherwise
+        """
         with tracer.start_as_current_span("validate_invoice") as span:
             span.set_attribute("invoice_id", invoice.id)
             span.set_attribute("tenant", invoice.tenant)
             span.set_attribute("order_id", invoice.order_id)
+            span.set_attribute("original_amount", invoice.amount_cents)
             
             # Get order events to recalculate expected amount
             query = select(OrderEvent).where(
@@ -75,39 +157,187 @@ class BillingService:
             result = await db.execute(query)
             events = result.scalars().all()
             
-            # Calculate expected operations from events
-            operations = self._calculate_operations_from_events(events)
+            discrepancy = self._find_discrepancy(invoice, events)
             
-            # Calculate expected amount
-            expected_amount = compute_amount_cents(operations, invoice.tenant)
+            span.set_attribute("adjustment_created", discrepancy is not None)
+            if discrepancy is not None:
+                span.set_attribute("delta_cents", discrepancy["delta_cents"])
             
-            span.set_attribute("original_amount", invoice.amount_cents)
-            span.set_attribute("expected_amount", expected_amount)
+            return discrepancy
+    
+    async def calculate_invoice_adjustments(
+        self, 
+        db: AsyncSession, 
+        invoices: List[Invoice]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Recalculate a batch of invoices with a single order-event query.
+        
+        Batch counterpart of calculate_invoice_adjustment: loads the events
+        for every invoiced order at once and recalculates in memory, instead
+        of one events round-trip per invoice.
+        
+        Args:
+            db (AsyncSession): Database session for data access
+            invoices (List[Invoice]): Invoice records (or rows with the same attributes)
             
-            # Check if adjustment is needed
-            if invoice.amount_cents != expected_amount:
-                adjustment_cents = expected_amount - invoice.amount_cents
-                
-                # Create adjustment record
-                adjustment = InvoiceAdjustment(
-                    tenant=invoice.tenant,
-                    invoice_id=invoice.id,
-                    reason="RECALCULATION",
-                    delta_cents=adjustment_cents,
-                    rationale=f"Recalculated amount based on actual operations. Expected: ${expected_amount/100:.2f}, Original: ${invoice.amount_cents/100:.2f}",
-                    created_by="system"
+        Returns:
+            Dict[int, Dict[str, Any]]: Discrepancies keyed by invoice ID,
+            only for invoices that need an adjustment
+        """
+        with tracer.start_as_current_span("validate_invoices_batch") as span:
+            span.set_attribute("invoice_count", len(invoices))
+            
+            if not invoices:
+                return {}
+            
+            query = select(OrderEvent).where(
+                OrderEvent.tenant.in_({invoice.tenant for invoice in invoices}),
+                OrderEvent.order_id.in_({invoice.order_id for invoice in invoices})
+            )
+            result = await db.execute(query)
+            
+            events_by_order = defaultdict(list)
+            for event in result.scalars():
+                events_by_order[(event.tenant, event.order_id)].append(event)
+            
+            adjustments = {}
+            for invoice in invoices:
+                discrepancy = self._find_discrepancy(
+                    invoice, events_by_order.get((invoice.tenant, invoice.order_id), [])
                 )
+                if discrepancy is not None:
+                    adjustments[invoice.id] = discrepancy
+            
+            span.set_attribute("adjustments_created", len(adjustments))
+            return adjustments
+    
+    async def generate_tariff_adjustments(
+        self, 
+        db: AsyncSession, 
+        tenant: str
+    ) -> Dict[str, int]:
+        """
+        Create adjustments for DRAFT invoices billed off the current tariff.
+        
+        On PostgreSQL the recalculation runs server-side through the
+        compute_expected_amount function in a single INSERT ... SELECT, so
+        no invoice rows travel to Python. Other dialects recalculate with
+        compute_amount_cents. Invoices that already carry an adjustment are
+        skipped.
+        
+        Args:
+            db (AsyncSession): Database session for data access
+            tenant (str): Tenant identifier
+            
+        Returns:
+            Dict[str, int]: Adjustments created and their total absolute delta
+        """
+        with tracer.start_as_current_span("generate_tariff_adjustments") as span:
+            span.set_attribute("tenant", tenant)
+            
+            billing_config = get_billing_config(tenant)
+            conn = await db.connection()
+            
+            if conn.dialect.name == "postgresql":
+                result = await db.execute(
+                    _TARIFF_ADJUSTMENT_SQL,
+                    {"tenant": tenant, "cfg": json.dumps(dict(billing_config), default=str)}
+                )
+                adjustments = [dict(row) for row in result.mappings()]
+            else:
+                adjusted = select(InvoiceAdjustment.invoice_id)
+                query = select(
+                    Invoice.id, Invoice.tenant, Invoice.billable_ops, Invoice.amount_cents
+                ).where(
+                    Invoice.tenant == tenant,
+                    Invoice.status == "DRAFT",
+                    Invoice.id.not_in(adjusted)
+                )
+                result = await db.execute(query)
                 
-                db.add(adjustment)
-                await db.flush()
-                
-                span.set_attribute("adjustment_created", True)
-                span.set_attribute("delta_cents", adjustment_cents)
+                discrepancies = []
+                for invoice in result:
+                    expected = compute_amount_cents(invoice.billable_ops or {}, tenant)
+                    if expected != invoice.amount_cents:
+                        discrepancies.append({
+                            "tenant": invoice.tenant,
+                            "invoice_id": invoice.id,
+                            "reason": "RECALCULATION",
+                            "delta_cents": expected - invoice.amount_cents,
+                            "expected_amount_cents": expected,
+                            "original_amount_cents": invoice.amount_cents
+                        })
                 
-                return adjustment
+                await bulk_insert_adjustments(
+                    db, [self.build_adjustment_row(d) for d in discrepancies]
+                )
+                adjustments = discrepancies
             
-            span.set_attribute("adjustment_created", False)
+            record_adjustment_metrics(adjustments)
+            
+            span.set_attribute("adjustments_created", len(adjustments))
+            return {
+                "adjustments_created": len(adjustments),
+                "total_adjustment_cents": sum(abs(a["delta_cents"]) for a in adjustments)
+            }
+    
+    @staticmethod
+    def build_adjustment_row(discrepancy: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build InvoiceAdjustment column values from a discrepancy.
+        
+        The rationale text is only rendered here, right before persistence,
+        so the validation pass itself stays numeric.
+        
+        Args:
+            discrepancy (Dict[str, Any]): Output of calculate_invoice_adjustment(s)
+            
+        Returns:
+            Dict[str, Any]: Column values for an InvoiceAdjustment insert
+        """
+        return {
+            "tenant": discrepancy["tenant"],
+            "invoice_id": discrepancy["invoice_id"],
+            "reason": discrepancy["reason"],
+            "delta_cents": discrepancy["delta_cents"],
+            "rationale": f"Recalculated amount based on actual operations. Expected: ${discrepancy['expected_amount_cents']/100:.2f}, Original: ${discrepancy['original_amount_cents']/100:.2f}",
+            "created_by": "system"
+        }
+    
+    def _find_discrepancy(
+        self, 
+        invoice: Invoice, 
+        events: list
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compare an invoice against its order events.
+        
+        Args:
+            invoice (Invoice): Invoice record to check
+            events (list): Order events for the invoiced order
+            
+        Returns:
+            Optional[Dict[str, Any]]: Numeric discrepancy if the amounts
+            differ, None otherwise
+        """
+        # Calculate expected operations from events
+        operations = self._calculate_operations_from_events(events)
+        
+        # Calculate expected amount
+        expected_amount = compute_amount_cents(operations, invoice.tenant)
+        
+        if invoice.amount_cents == expected_amount:
             return None
+        
+        return {
+            "tenant": invoice.tenant,
+            "invoice_id": invoice.id,
+            "reason": "RECALCULATION",
+            "delta_cents": expected_amount - invoice.amount_cents,
+            "expected_amount_cents": expected_amount,
+            "original_amount_cents": invoice.amount_cents
+        }
     
     # ==== OPERATIONS CALCULATION ==== #
     
@@ -184,99 +414,189 @@ def compute_amount_cents(
         # Get billing configuration
         billing_config = get_billing_config(tenant)
         
-        total_cents = 0
-        
-        # Core operation fees
-        pick_count = operations.get("pick", 0)
-        pack_count = operations.get("pack", 0)
-        label_count = operations.get("label", 0)
-        kitting_count = operations.get("kitting", 0)
+        total_cents = _amount_cents(operations, billing_config)
         
-        total_cents += pick_count * billing_config.get("pick_fee_cents", 30)
-        total_cents += pack_count * billing_config.get("pack_fee_cents", 20)
-        total_cents += label_count * billing_config.get("label_fee_cents", 15)
-        total_cents += kitting_count * billing_config.get("kitting_fee_cents", 50)
+        span.set_attribute("total_amount_cents", total_cents)
+        span.set_attribute("operations_count", sum(operations.get(op, 0) for op, _, _ in _CORE_FEE_SPECS))
         
-        # Storage fees
-        storage_days = operations.get("storage_days", 0)
-        if storage_days > 0:
-            storage_rate = billing_config.get("storage_fee_cents_per_day", 5)
-            
-            # Check for long-term storage
-            long_term_days = billing_config.get("long_term_storage_days", 90)
-            long_term_multiplier = billing_config.get("long_term_storage_multiplier", 2.0)
-            
-            if storage_days > long_term_days:
-                # Apply long-term storage rate
-                regular_days = long_term_days
-                long_term_days_count = storage_days - long_term_days
-                
-                total_cents += regular_days * storage_rate
-                total_cents += int(long_term_days_count * storage_rate * long_term_multiplier)
-            else:
-                total_cents += storage_days * storage_rate
+        return total_cents
+
+
+def compute_amount_cents_batch(
+    operations_list: List[Dict[str, Any]], 
+    tenant: str = "default"
+) -> List[int]:
+    """
+    Compute invoice amounts in cents for many operation sets at once.
+    
+    Equivalent to calling compute_amount_cents per entry, but resolves the
+    tenant's billing configuration and opens the tracing span once for the
+    whole batch.
+    
+    Args:
+        operations_list (List[Dict[str, Any]]): Billable operations per order
+        tenant (str): Tenant identifier for billing configuration
         
-        # Value-added services
-        if operations.get("photo", False):
-            total_cents += billing_config.get("photo_fee_cents", 25)
+    Returns:
+        List[int]: Total amounts in cents, in input order
+    """
+    with tracer.start_as_current_span("compute_billing_amount_batch") as span:
+        span.set_attribute("tenant", tenant)
+        span.set_attribute("batch_size", len(operations_list))
         
-        if operations.get("quality_check", False):
-            total_cents += billing_config.get("quality_check_fee_cents", 50)
+        billing_config = get_billing_config(tenant)
+        amounts = [_amount_cents(operations, billing_config) for operations in operations_list]
         
-        if operations.get("custom_packaging", False):
-            total_cents += billing_config.get("custom_packaging_fee_cents", 200)
+        span.set_attribute("total_amount_cents", sum(amounts))
+        return amounts
+
+
+def _amount_cents(operations: Dict[str, Any], billing_config: Mapping[str, Any]) -> int:
+    """Apply the tariff rules in billing_config to one set of operations."""
+    total_cents = 0
+    
+    # Core operation fees: counts · rates
+    core_counts = [operations.get(op, 0) for op, _, _ in _CORE_FEE_SPECS]
+    core_rates = [billing_config.get(rate_key, default) for _, rate_key, default in _CORE_FEE_SPECS]
+    total_cents += sum(map(operator.mul, core_counts, core_rates))
+    
+    # Storage fees
+    storage_days = operations.get("storage_days", 0)
+    if storage_days > 0:
+        storage_rate = billing_config.get("storage_fee_cents_per_day", 5)
         
-        if operations.get("gift_wrap", False):
-            total_cents += billing_config.get("gift_wrap_fee_cents", 100)
+        # Check for long-term storage
+        long_term_days = billing_config.get("long_term_storage_days", 90)
+        long_term_multiplier = billing_config.get("long_term_storage_multiplier", 2.0)
         
-        # Return processing
-        return_count = operations.get("returns", 0)
-        if return_count > 0:
-            return_fee = billing_config.get("return_processing_fee_cents", 75)
-            restocking_fee = billing_config.get("restocking_fee_cents", 150)
-            inspection_fee = billing_config.get("inspection_fee_cents", 25)
+        if storage_days > long_term_days:
+            # Apply long-term storage rate
+            regular_days = long_term_days
+            long_term_days_count = storage_days - long_term_days
             
-            total_cents += return_count * (return_fee + restocking_fee + inspection_fee)
-        
-        # Apply minimum fee
-        min_fee = billing_config.get("min_order_fee_cents", 50)
-        total_cents = max(total_cents, min_fee)
-        
-        # Apply multipliers for special handling
-        if operations.get("rush", False):
-            rush_multiplier = billing_config.get("rush_multiplier", 2.0)
-            total_cents = int(total_cents * rush_multiplier)
-        
-        if operations.get("oversized", False):
-            oversized_multiplier = billing_config.get("oversized_multiplier", 1.5)
-            total_cents = int(total_cents * oversized_multiplier)
-        
-        if operations.get("hazmat", False):
-            hazmat_multiplier = billing_config.get("hazmat_multiplier", 3.0)
-            total_cents = int(total_cents * hazmat_multiplier)
-        
-        if operations.get("fragile", False):
-            fragile_multiplier = billing_config.get("fragile_multiplier", 1.2)
-            total_cents = int(total_cents * fragile_multiplier)
-        
-        # Apply volume discounts
-        monthly_orders = operations.get("monthly_order_count", 0)
-        if monthly_orders >= billing_config.get("volume_tier_3_orders", 1000):
-            discount = billing_config.get("volume_tier_3_discount", 0.15)
-            total_cents = int(total_cents * (1 - discount))
-        elif monthly_orders >= billing_config.get("volume_tier_2_orders", 500):
-            discount = billing_config.get("volume_tier_2_discount", 0.10)
-            total_cents = int(total_cents * (1 - discount))
-        elif monthly_orders >= billing_config.get("volume_tier_1_orders", 100):
-            discount = billing_config.get("volume_tier_1_discount", 0.05)
-            total_cents = int(total_cents * (1 - discount))
-        
-        span.set_attribute("total_amount_cents", total_cents)
-        span.set_attribute("operations_count", sum([
-            pick_count, pack_count, label_count, kitting_count
-        ]))
+            total_cents += regular_days * storage_rate
+            total_cents += int(long_term_days_count * storage_rate * long_term_multiplier)
+        else:
+            total_cents += storage_days * storage_rate
+    
+    # Value-added services
+    if operations.get("photo", False):
+        total_cents += billing_config.get("photo_fee_cents", 25)
+    
+    if operations.get("quality_check", False):
+        total_cents += billing_config.get("quality_check_fee_cents", 50)
+    
+    if operations.get("custom_packaging", False):
+        total_cents += billing_config.get("custom_packaging_fee_cents", 200)
+    
+    if operations.get("gift_wrap", False):
+        total_cents += billing_config.get("gift_wrap_fee_cents", 100)
+    
+    # Return processing
+    return_count = operations.get("returns", 0)
+    if return_count > 0:
+        return_fee = billing_config.get("return_processing_fee_cents", 75)
+        restocking_fee = billing_config.get("restocking_fee_cents", 150)
+        inspection_fee = billing_config.get("inspection_fee_cents", 25)
+        
+        total_cents += return_count * (return_fee + restocking_fee + inspection_fee)
+    
+    # Apply minimum fee
+    min_fee = billing_config.get("min_order_fee_cents", 50)
+    total_cents = max(total_cents, min_fee)
+    
+    # Apply multipliers for special handling, truncating to whole cents
+    # after each one (compute_expected_amount does the same server-side)
+    for flag, rate_key, default in _MULTIPLIER_SPECS:
+        if operations.get(flag, False):
+            total_cents = int(total_cents * billing_config.get(rate_key, default))
+    
+    # Apply volume discounts
+    monthly_orders = operations.get("monthly_order_count", 0)
+    if monthly_orders >= billing_config.get("volume_tier_3_orders", 1000):
+        discount = billing_config.get("volume_tier_3_discount", 0.15)
+        total_cents = int(total_cents * (1 - discount))
+    elif monthly_orders >= billing_config.get("volume_tier_2_orders", 500):
+        discount = billing_config.get("volume_tier_2_discount", 0.10)
+        total_cents = int(total_cents * (1 - discount))
+    elif monthly_orders >= billing_config.get("volume_tier_1_orders", 100):
+        discount = billing_config.get("volume_tier_1_discount", 0.05)
+        total_cents = int(total_cents * (1 - discount))
+    
+    return total_cents
+
+
+# Column order for COPY-based adjustment writes
+_ADJUSTMENT_COPY_COLUMNS = (
+    "invoice_id", "tenant", "reason", "delta_cents", "rationale",
+    "ai_generated", "ai_confidence", "created_at", "created_by"
+)
+
+
+async def bulk_insert_adjustments(
+    db: AsyncSession, 
+    rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Write adjustment rows within the session's current transaction.
+    
+    On asyncpg the rows are streamed with the COPY protocol, bypassing
+    statement parsing; other dialects fall back to an executemany INSERT.
+    COPY skips ORM column defaults, so they are filled in here.
+    
+    Args:
+        db (AsyncSession): Database session for data access
+        rows (List[Dict[str, Any]]): Output of build_adjustment_row
+    """
+    if not rows:
+        return
+    
+    conn = await db.connection()
+    if conn.dialect.driver != "asyncpg":
+        await db.execute(insert(InvoiceAdjustment), rows)
+        return
+    
+    created_at = datetime.utcnow()
+    records = [
+        (
+            row["invoice_id"], row["tenant"], row["reason"], row["delta_cents"],
+            row["rationale"], row.get("ai_generated", False), row.get("ai_confidence"),
+            row.get("created_at", created_at), row.get("created_by", "system")
+        )
+        for row in rows
+    ]
+    
+    raw_conn = await conn.get_raw_connection()
+    await raw_conn.driver_connection.copy_records_to_table(
+        InvoiceAdjustment.__tablename__,
+        records=records,
+        columns=list(_ADJUSTMENT_COPY_COLUMNS)
+    )
+
+
+def record_adjustment_metrics(adjustments: Iterable[Dict[str, Any]]) -> None:
+    """
+    Record Prometheus metrics for a batch of invoice adjustments.
+    
+    Label-bound children are resolved once per (tenant, reason) pair
+    rather than once per adjustment.
+    
+    Args:
+        adjustments (Iterable[Dict[str, Any]]): Adjustment column values
+            with tenant, reason and delta_cents
+    """
+    bound_metrics = {}
+    for adjustment in adjustments:
+        key = (adjustment["tenant"], adjustment["reason"])
+        metrics = bound_metrics.get(key)
+        if metrics is None:
+            metrics = bound_metrics[key] = (
+                invoice_adjustments_total.labels(tenant=key[0], reason=key[1]),
+                invoice_adjustment_amount_cents.labels(tenant=key[0], reason=key[1])
+            )
         
-        return total_cents
+        metrics[0].inc()
+        metrics[1].observe(abs(adjustment["delta_cents"]))
 
 
 # ==== VALIDATION AND ANALYSIS FUNCTIONS ==== #
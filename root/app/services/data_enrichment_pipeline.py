@@ -18,7 +18,7 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Set, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from sqlalchemy import select, and_, or_, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -78,6 +78,10 @@ class EnrichmentState:
     retry_count: int = 0
     error_messages: List[str] = None
     
+    # Strong reference to the loaded record: the session's identity map only
+    # holds clean objects weakly, so without it db.get() would query again
+    record: Optional[ExceptionRecord] = field(default=None, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.error_messages is None:
             self.error_messages = []
@@ -145,7 +149,8 @@ class DataEnrichmentPipeline:
         self,
         tenant: str,
         batch_size: int = 50,
-        max_retries: int = 3
+        max_retries: int = 3,
+        db: Optional[AsyncSession] = None
     ) -> Dict[str, Any]:
         """
         Process the complete enrichment pipeline for a tenant.
@@ -154,6 +159,8 @@ class DataEnrichmentPipeline:
             tenant (str): Tenant identifier
             batch_size (int): Number of records to process per batch
             max_retries (int): Maximum retry attempts for failed enrichment
+            db (Optional[AsyncSession]): Caller-owned session to run on;
+                a new session is opened when omitted
             
         Returns:
             Dict[str, Any]: Pipeline execution results and statistics
@@ -174,52 +181,78 @@ class DataEnrichmentPipeline:
                 "errors": []
             }
             
-            async with get_session() as db:
-                try:
-                    # Step 1: Identify records needing enrichment
-                    enrichment_candidates = await self._identify_enrichment_candidates(db, tenant)
-                    
-                    logger.info(f"Found {len(enrichment_candidates)} records needing enrichment")
-                    
-                    # Step 2: Process records in batches
-                    for i in range(0, len(enrichment_candidates), batch_size):
-                        batch = enrichment_candidates[i:i + batch_size]
-                        
-                        batch_results = await self._process_enrichment_batch(
-                            db, batch, max_retries
-                        )
-                        
-                        # Update statistics
-                        stats["records_processed"] += len(batch)
-                        stats["records_completed"] += batch_results["completed"]
-                        stats["records_failed"] += batch_results["failed"]
-                        
-                        for stage, count in batch_results["stages_processed"].items():
-                            stats["stages_processed"][stage] += count
-                        
-                        stats["errors"].extend(batch_results["errors"])
-                        
-                        # Commit batch
-                        await db.commit()
-                        
-                        logger.info(f"Processed batch {i//batch_size + 1}: "
-                                   f"{batch_results['completed']} completed, "
-                                   f"{batch_results['failed']} failed")
-                    
-                    # Step 3: Generate completeness report
-                    completeness_report = await self._generate_completeness_report(db, tenant)
-                    stats["completeness_report"] = completeness_report
-                    
-                    logger.info(f"Enrichment pipeline completed for tenant {tenant}: "
-                               f"{stats['records_completed']} completed, "
-                               f"{stats['records_failed']} failed")
-                    
-                    return stats
-                    
-                except Exception as e:
-                    logger.error(f"Enrichment pipeline failed for tenant {tenant}: {e}")
-                    stats["errors"].append(f"Pipeline failure: {str(e)}")
-                    raise
+            if db is not None:
+                return await self._run_enrichment_pipeline(db, tenant, batch_size, max_retries, stats)
+            
+            async with get_session() as session:
+                return await self._run_enrichment_pipeline(session, tenant, batch_size, max_retries, stats)
+    
+    async def _run_enrichment_pipeline(
+        self,
+        db: AsyncSession,
+        tenant: str,
+        batch_size: int,
+        max_retries: int,
+        stats: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Run the enrichment pipeline steps on a session.
+        
+        Args:
+            db (AsyncSession): Database session
+            tenant (str): Tenant identifier
+            batch_size (int): Number of records to process per batch
+            max_retries (int): Maximum retry attempts for failed enrichment
+            stats (Dict[str, Any]): Statistics dict to fill in
+            
+        Returns:
+            Dict[str, Any]: Pipeline execution results and statistics
+        """
+        try:
+            # Step 1: Identify records needing enrichment
+            enrichment_candidates = await self._identify_enrichment_candidates(db, tenant)
+            
+            logger.info(f"Found {len(enrichment_candidates)} records needing enrichment")
+            
+            # Step 2: Process records in batches
+            for i in range(0, len(enrichment_candidates), batch_size):
+                batch = enrichment_candidates[i:i + batch_size]
+                
+                batch_results = await self._process_enrichment_batch(
+                    db, batch, max_retries
+                )
+                
+                # Update statistics
+                stats["records_processed"] += len(batch)
+                stats["records_completed"] += batch_results["completed"]
+                stats["records_failed"] += batch_results["failed"]
+                
+                for stage, count in batch_results["stages_processed"].items():
+                    stats["stages_processed"][stage] += count
+                
+                stats["errors"].extend(batch_results["errors"])
+                
+                # Commit batch
+                await db.commit()
+                
+                logger.info(f"Processed batch {i//batch_size + 1}: "
+                           f"{batch_results['completed']} completed, "
+                           f"{batch_results['failed']} failed")
+            
+            # Step 3: Generate completeness report
+            completeness_report = await self._generate_completeness_report(db, tenant)
+            stats["completeness_report"] = completeness_report
+            
+            logger.info(f"Enrichment pipeline completed for tenant {tenant}: "
+                       f"{stats['records_completed']} completed, "
+                       f"{stats['records_failed']} failed")
+            
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Enrichment pipeline failed for tenant {tenant}: {e}")
+            stats["errors"].append(f"Pipeline failure: {str(e)}")
+            raise
     
     async def _identify_enrichment_candidates(
         self,
@@ -280,7 +313,8 @@ class DataEnrichmentPipeline:
         """
         state = EnrichmentState(
             record_id=record.id,
-            record_type="exception"
+            record_type="exception",
+            record=record
         )
         
         # Analyze order analysis stage (new AI Order Problem Detection)
@@ -389,10 +423,9 @@ class DataEnrichmentPipeline:
             bool: True if successful, False if failed
         """
         try:
-            # Get the exception record
-            record_query = select(ExceptionRecord).where(ExceptionRecord.id == state.record_id)
-            result = await db.execute(record_query)
-            record = result.scalar_one_or_none()
+            # Get the exception record; the state keeps the loaded candidate
+            # alive, so this is an identity-map hit rather than a query
+            record = await db.get(ExceptionRecord, state.record_id)
             
             if not record:
                 state.order_analysis = EnrichmentStatus.FAILED
@@ -448,10 +481,9 @@ class DataEnrichmentPipeline:
             bool: True if successful, False if failed
         """
         try:
-            # Get the exception record
-            record_query = select(ExceptionRecord).where(ExceptionRecord.id == state.record_id)
-            result = await db.execute(record_query)
-            record = result.scalar_one_or_none()
+            # Get the exception record; the state keeps the loaded candidate
+            # alive, so this is an identity-map hit rather than a query
+            record = await db.get(ExceptionRecord, state.record_id)
             
             if not record:
                 state.classification = EnrichmentStatus.FAILED
@@ -492,10 +524,9 @@ class DataEnrichmentPipeline:
             bool: True if successful, False if failed
         """
         try:
-            # Get the exception record
-            record_query = select(ExceptionRecord).where(ExceptionRecord.id == state.record_id)
-            result = await db.execute(record_query)
-            record = result.scalar_one_or_none()
+            # Get the exception record; the state keeps the loaded candidate
+            # alive, so this is an identity-map hit rather than a query
+            record = await db.get(ExceptionRecord, state.record_id)
             
             if not record:
                 state.automation = EnrichmentStatus.FAILED
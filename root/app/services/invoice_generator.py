@@ -9,9 +9,10 @@ billing configurations.
 """
 
 import datetime as dt
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.storage.models import OrderEvent, Invoice
 from app.services.billing import compute_amount_cents
@@ -22,6 +23,21 @@ from app.observability.logging import ContextualLogger
 tracer = get_tracer(__name__)
 logger = ContextualLogger(__name__)
 
+# Events every order needs before it can be invoiced
+REQUIRED_COMPLETION_EVENTS = frozenset({
+    "order_paid",
+    "pick_completed",
+    "pack_completed"
+})
+
+# Optional completion events (at least one should be present)
+SHIPPING_COMPLETION_EVENTS = frozenset({
+    "ship_label_printed",
+    "label_created",
+    "manifested",
+    "shipped"
+})
+
 
 class InvoiceGeneratorService:
     """
@@ -61,73 +77,108 @@ class InvoiceGeneratorService:
         Returns:
             Generated invoice or None if failed
         """
+        try:
+            invoice, _ = await self.ensure_invoice(
+                tenant, order_id,
+                customer_email=customer_email,
+                currency=currency,
+                line_items=line_items
+            )
+            return invoice
+        except Exception as e:
+            logger.error(f"Failed to generate invoice for order {order_id}: {e}")
+            return None
+    
+    async def ensure_invoice(
+        self,
+        tenant: str,
+        order_id: str,
+        customer_email: str = "",
+        currency: str = "USD",
+        line_items: List = None
+    ) -> Tuple[Invoice, bool]:
+        """
+        Make sure an order has an invoice, creating it if needed.
+        
+        Unlike generate_invoice, failures propagate so callers such as the
+        invoice queue worker can retry them.
+        
+        Args:
+            tenant: Tenant identifier
+            order_id: Order identifier
+            customer_email: Customer email address
+            currency: Currency code
+            line_items: List of line items
+            
+        Returns:
+            Tuple of (invoice, whether it was created by this call)
+            
+        Raises:
+            ValueError: If the order has no events to bill
+        """
         from app.storage.db import get_session
         
         async with get_session() as db:
-            try:
-                # Check if invoice already exists
-                existing = await self._check_existing_invoice(db, tenant, order_id)
-                if existing:
-                    logger.info(f"Invoice already exists for order {order_id}")
-                    return existing
-                
-                # Get order events for billable operations calculation
-                events_query = select(OrderEvent).where(
-                    and_(
-                        OrderEvent.tenant == tenant,
-                        OrderEvent.order_id == order_id
-                    )
-                )
-                result = await db.execute(events_query)
-                events = result.scalars().all()
-                
-                if not events:
-                    logger.warning(f"No events found for order {order_id}")
-                    return None
-                
-                # Calculate billable operations
-                billable_ops = self._calculate_billable_operations(events)
-                
-                # Generate invoice number
-                invoice_number = await self._generate_invoice_number(db, tenant)
-                
-                # Calculate amount from billable operations (ignore passed total_amount)
-                amount_cents = compute_amount_cents(billable_ops, tenant)
-                logger.info(f"Calculated 3PL service fees: {amount_cents} cents for operations {billable_ops}")
-                
-                invoice = Invoice(
-                    tenant=tenant,
-                    order_id=order_id,
-                    invoice_number=invoice_number,
-                    billable_ops=billable_ops,
-                    amount_cents=amount_cents,
-                    currency=currency,
-                    status="PENDING",
-                    invoice_date=dt.datetime.utcnow(),
-                    due_date=dt.datetime.utcnow() + dt.timedelta(days=30)
+            # Get order events for billable operations calculation
+            events_query = select(OrderEvent).where(
+                and_(
+                    OrderEvent.tenant == tenant,
+                    OrderEvent.order_id == order_id
                 )
-                
-                db.add(invoice)
-                await db.commit()
-                await db.refresh(invoice)
-                
-                logger.info(f"Generated invoice {invoice_number} for order {order_id}: ${amount_cents/100:.2f}")
-                
-                # Generate invoice file if enabled
-                from app.settings import settings
-                logger.info(f"🔍 Checking invoice file generation - GENERATE_INVOICE_FILES: {settings.GENERATE_INVOICE_FILES}")
-                if settings.GENERATE_INVOICE_FILES:
-                    logger.info(f"🔍 Triggering invoice file generation for invoice {invoice_number}")
-                    await self._generate_invoice_file(invoice, customer_email, line_items or [])
-                else:
-                    logger.info(f"🔍 Invoice file generation disabled in settings")
-                
-                return invoice
-                
-            except Exception as e:
-                logger.error(f"Failed to generate invoice for order {order_id}: {e}")
+            )
+            result = await db.execute(events_query)
+            events = result.scalars().all()
+            
+            if not events:
+                raise ValueError(f"No events found for order {order_id}")
+            
+            # Calculate billable operations
+            billable_ops = self._calculate_billable_operations(events)
+            
+            # Generate invoice number
+            invoice_number = await self._generate_invoice_number(db, tenant)
+            
+            # Calculate amount from billable operations
+            amount_cents = compute_amount_cents(billable_ops, tenant)
+            logger.info(f"Calculated 3PL service fees: {amount_cents} cents for operations {billable_ops}")
+            
+            # Insert unless the order is already invoiced; the unique
+            # (tenant, order_id) index makes this atomic across workers
+            insert_stmt = pg_insert(Invoice).values(
+                tenant=tenant,
+                order_id=order_id,
+                invoice_number=invoice_number,
+                billable_ops=billable_ops,
+                amount_cents=amount_cents,
+                currency=currency,
+                status="PENDING",
+                invoice_date=dt.datetime.utcnow(),
+                due_date=dt.datetime.utcnow() + dt.timedelta(days=30)
+            ).on_conflict_do_nothing(
+                index_elements=['tenant', 'order_id']
+            ).returning(Invoice)
+            
+            invoice = (await db.scalars(insert_stmt)).first()
+            if invoice is None:
+                logger.info(f"Invoice already exists for order {order_id}")
                 await db.rollback()
-                return None
+                return await self._check_existing_invoice(db, tenant, order_id), False
+            
+            await db.commit()
+            await db.refresh(invoice)
+            
+            logger.info(f"Generated invoice {invoice_number} for order {order_id}: ${amount_cents/100:.2f}")
+            
+            # Generate invoice file if enabled
+            from app.settings import settings
+            logger.info(f"🔍 Checking invoice file generation - GENERATE_INVOICE_FILES: {settings.GENERATE_INVOICE_FILES}")
+            if settings.GENERATE_INVOICE_FILES:
+                logger.info(f"🔍 Triggering invoice file generation for invoice {invoice_number}")
+                await self._generate_invoice_file(invoice, customer_email, line_items or [])
+            else:
+                logger.info(f"🔍 Invoice file generation disabled in settings")
+            
+            return invoice, True
     
     async def _generate_invoice_file(self, invoice: Invoice, customer_email: str, line_items: List) -> None:
         """Generate invoice text file."""
@@ -357,26 +408,11 @@ Status: {invoice.status}
         """
         event_types = {event.event_type for event in events}
         
-        # Required events for completion
-        required_events = {
-            "order_paid",
-            "pick_completed", 
-            "pack_completed"
-        }
-        
-        # Optional completion events (at least one should be present)
-        completion_events = {
-            "ship_label_printed",
-            "label_created", 
-            "manifested",
-            "shipped"
-        }
-        
         # Check if all required events are present
-        has_required = required_events.issubset(event_types)
+        has_required = REQUIRED_COMPLETION_EVENTS.issubset(event_types)
         
         # Check if at least one completion event is present (or skip this check for now)
-        has_completion = bool(completion_events.intersection(event_types))
+        has_completion = not SHIPPING_COMPLETION_EVENTS.isdisjoint(event_types)
         
         # For now, just require the core fulfillment events
         return has_required
@@ -549,15 +585,21 @@ Status: {invoice.status}
         now = dt.datetime.utcnow()
         year_month = now.strftime("%Y%m")
         
-        # Count existing invoices for this tenant and month
-        query = select(Invoice).where(
+        # Serialize numbering per tenant until the caller's transaction ends,
+        # so concurrent generations cannot count the same existing invoices
+        await db.execute(
+            select(func.pg_advisory_xact_lock(func.hashtext(f"invoice_number:{tenant}")))
+        )
+        
+        # Count existing invoices for this tenant and month in SQL; served
+        # by ix_invoices_tenant_created without loading any invoice rows
+        query = select(func.count(Invoice.id)).where(
             and_(
                 Invoice.tenant == tenant,
                 Invoice.created_at >= dt.datetime(now.year, now.month, 1)
             )
         )
-        result = await db.execute(query)
-        existing_count = len(result.scalars().all())
+        existing_count = (await db.execute(query)).scalar_one()
         
         # Generate sequential number
         sequence = existing_count + 1
@@ -569,6 +611,29 @@ Status: {invoice.status}
         return invoice_number
 
 
+# ==== GLOBAL SERVICE INSTANCE ==== #
+
+
+# Global instance
+_invoice_generator: Optional[InvoiceGeneratorService] = None
+
+
+def get_invoice_generator() -> InvoiceGeneratorService:
+    """
+    Get global invoice generator service instance.
+    
+    The service holds no per-session state, so flows and workers share
+    one instance instead of constructing it on every run.
+    
+    Returns:
+        InvoiceGeneratorService: Global invoice generator instance
+    """
+    global _invoice_generator
+    if _invoice_generator is None:
+        _invoice_generator = InvoiceGeneratorService()
+    return _invoice_generator
+
+
 # ==== STANDALONE FUNCTIONS ==== #
 
 
@@ -592,7 +657,7 @@ async def generate_missing_invoices(
     Returns:
         List[Invoice]: List of generated invoices
     """
-    generator = InvoiceGeneratorService()
+    generator = get_invoice_generator()
     return await generator.generate_invoices_for_completed_orders(
         db, tenant, lookback_hours
     )
@@ -624,7 +689,7 @@ async def backfill_invoices_for_tenant(
     # Calculate lookback hours from date range
     lookback_hours = int((end_date - start_date).total_seconds() / 3600)
     
-    generator = InvoiceGeneratorService()
+    generator = get_invoice_generator()
     return await generator.generate_invoices_for_completed_orders(
         db, tenant, lookback_hours
     )
@@ -0,0 +1,185 @@
+# ==== INVOICE GENERATION QUEUE ==== #
+
+"""
+Redis stream queue for background invoice generation in Octup E²A.
+
+Flows enqueue completed orders instead of generating invoices inline;
+workers drain the stream with bounded concurrency, retry transient
+failures and move orders that keep failing to the dead letter queue.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from app.storage.db import get_session
+from app.storage.dlq import push_dlq
+from app.storage.redis import get_redis_client
+from app.services.invoice_generator import get_invoice_generator
+from app.observability.logging import ContextualLogger
+
+
+# ==== MODULE CONFIGURATION ==== #
+
+
+logger = ContextualLogger(__name__)
+
+INVOICE_QUEUE_STREAM = "invoice_generation"
+INVOICE_QUEUE_GROUP = "invoice_workers"
+
+# Dedupe keys are cleared once a job finishes; the TTL only frees orders
+# whose job was lost with a crashed worker, well inside the pipeline's
+# lookback so the next run re-enqueues them. The unique (tenant, order_id)
+# index still guards against a duplicate invoice either way
+INVOICE_DEDUPE_TTL_SECONDS = 3600
+
+INVOICE_MAX_ATTEMPTS = 3
+
+
+def _dedupe_key(tenant: str, order_id: str) -> str:
+    return f"invoice_queue:{tenant}:{order_id}"
+
+
+# ==== PRODUCER ==== #
+
+
+async def enqueue_many(jobs: List[Dict[str, str]]) -> int:
+    """
+    Enqueue invoice generation jobs, skipping orders already queued.
+
+    Args:
+        jobs: Jobs with ``tenant`` and ``order_id`` keys
+
+    Returns:
+        int: Number of jobs actually added to the stream
+    """
+    if not jobs:
+        return 0
+
+    client = await get_redis_client()
+
+    # --► CLAIM DEDUPE KEYS IN ONE ROUND TRIP
+    async with client.pipeline(transaction=False) as pipe:
+        for job in jobs:
+            pipe.set(
+                _dedupe_key(job['tenant'], job['order_id']), 1,
+                nx=True, ex=INVOICE_DEDUPE_TTL_SECONDS
+            )
+        claimed = await pipe.execute()
+
+    fresh_jobs = [job for job, is_new in zip(jobs, claimed) if is_new]
+    if not fresh_jobs:
+        return 0
+
+    # --► APPEND CLAIMED JOBS TO THE STREAM
+    async with client.pipeline(transaction=False) as pipe:
+        for job in fresh_jobs:
+            pipe.xadd(INVOICE_QUEUE_STREAM, {**job, 'attempts': 0})
+        await pipe.execute()
+
+    return len(fresh_jobs)
+
+
+# ==== CONSUMER ==== #
+
+
+async def _ensure_consumer_group(client) -> None:
+    try:
+        await client.xgroup_create(INVOICE_QUEUE_STREAM, INVOICE_QUEUE_GROUP, id='0', mkstream=True)
+    except ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+async def drain_invoice_queue(
+    consumer: str,
+    batch_size: int = 100,
+    concurrency: int = 16,
+    block_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate invoices for one batch of queued orders.
+
+    Failed jobs are re-queued with an incremented attempt count; after
+    ``INVOICE_MAX_ATTEMPTS`` they are pushed to the dead letter queue.
+
+    Args:
+        consumer: Consumer name within the worker group
+        batch_size: Maximum jobs to read from the stream
+        concurrency: Maximum invoices generated at once
+        block_ms: How long to wait for jobs when the stream is empty
+
+    Returns:
+        Dict[str, Any]: Counts of generated, already invoiced, retried and
+        dead-lettered jobs
+    """
+    client = await get_redis_client()
+    await _ensure_consumer_group(client)
+
+    response = await client.xreadgroup(
+        INVOICE_QUEUE_GROUP, consumer, {INVOICE_QUEUE_STREAM: '>'},
+        count=batch_size, block=block_ms
+    )
+    entries = response[0][1] if response else []
+
+    ensure_invoice = get_invoice_generator().ensure_invoice
+    generation_slots = asyncio.Semaphore(concurrency)
+
+    async def _generate_one(fields: Dict[str, str]) -> Tuple[int, bool]:
+        # Failures raise, so they reach the retry and DLQ handling below
+        async with generation_slots:
+            invoice, created = await ensure_invoice(fields['tenant'], fields['order_id'])
+            return invoice.amount_cents, created
+
+    outcomes = await asyncio.gather(
+        *(_generate_one(fields) for _, fields in entries),
+        return_exceptions=True
+    )
+
+    drain_results = {
+        'jobs_read': len(entries),
+        'invoices_generated': 0,
+        'already_invoiced': 0,
+        'total_amount_cents': 0,
+        'retried': 0,
+        'dead_lettered': 0
+    }
+
+    async with client.pipeline(transaction=False) as pipe:
+        for (entry_id, fields), outcome in zip(entries, outcomes):
+            pipe.xack(INVOICE_QUEUE_STREAM, INVOICE_QUEUE_GROUP, entry_id)
+
+            if not isinstance(outcome, Exception):
+                amount_cents, created = outcome
+                if created:
+                    drain_results['invoices_generated'] += 1
+                    drain_results['total_amount_cents'] += amount_cents
+                else:
+                    drain_results['already_invoiced'] += 1
+                pipe.delete(_dedupe_key(fields['tenant'], fields['order_id']))
+                continue
+
+            attempts = int(fields.get('attempts', 0)) + 1
+            if attempts < INVOICE_MAX_ATTEMPTS:
+                pipe.xadd(INVOICE_QUEUE_STREAM, {**fields, 'attempts': attempts})
+                pipe.expire(_dedupe_key(fields['tenant'], fields['order_id']), INVOICE_DEDUPE_TTL_SECONDS)
+                drain_results['retried'] += 1
+                continue
+
+            logger.error(f"Invoice generation failed for order {fields['order_id']}: {outcome}")
+            async with get_session() as db:
+                await push_dlq(
+                    db,
+                    tenant=fields['tenant'],
+                    payload=dict(fields),
+                    error_class=type(outcome).__name__,
+                    error_message=str(outcome),
+                    source_operation="invoice_generation"
+                )
+            pipe.delete(_dedupe_key(fields['tenant'], fields['order_id']))
+            drain_results['dead_lettered'] += 1
+
+        await pipe.execute()
+
+    return drain_results
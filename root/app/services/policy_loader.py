@@ -10,7 +10,8 @@ with intelligent caching and fallback mechanisms for all tenants.
 
 import functools
 import os
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 
 import yaml
 
@@ -79,7 +80,7 @@ def get_sla_config(tenant: str) -> Dict[str, Any]:
 
 
 @functools.lru_cache(maxsize=64)
-def get_billing_config(tenant: str) -> Dict[str, Any]:
+def get_billing_config(tenant: str) -> Mapping[str, Any]:
     """
     Get billing configuration for tenant.
     
@@ -91,7 +92,8 @@ def get_billing_config(tenant: str) -> Dict[str, Any]:
         tenant (str): Tenant identifier for configuration lookup
         
     Returns:
-        Dict[str, Any]: Dictionary with billing rates and rules
+        Mapping[str, Any]: Read-only view of billing rates and rules; the
+        same cached object is shared by every caller until clear_cache()
     """
     with tracer.start_as_current_span("load_billing_config") as span:
         span.set_attribute("tenant", tenant)
@@ -109,14 +111,14 @@ def get_billing_config(tenant: str) -> Dict[str, Any]:
                 config = yaml.safe_load(f)
             
             span.set_attribute("config_loaded", True)
-            return config
+            return MappingProxyType(config)
             
         except FileNotFoundError:
             # Fallback to hardcoded defaults
             span.set_attribute("config_loaded", False)
             span.set_attribute("fallback_used", True)
             
-            return {
+            return MappingProxyType({
                 "pick_fee_cents": 30,     # $0.30 per pick
                 "pack_fee_cents": 20,     # $0.20 per pack
                 "label_fee_cents": 15,    # $0.15 per label
@@ -125,7 +127,7 @@ def get_billing_config(tenant: str) -> Dict[str, Any]:
                 "rush_multiplier": 2.0,          # 2x for rush orders
                 "oversized_multiplier": 1.5,     # 1.5x for oversized items
                 "hazmat_multiplier": 3.0         # 3x for hazmat items
-            }
+            })
 
 
 # ==== REASON CODE CONFIGURATION ==== #
@@ -66,6 +66,7 @@ class RealtimeProcessingTriggers:
         self.connection: Optional[asyncpg.Connection] = None
         self.listeners: Dict[str, List[Callable]] = {}
         self.running = False
+        self._stopped = asyncio.Event()
         
         # Processing handlers
         self.handlers = {
@@ -96,11 +97,12 @@ class RealtimeProcessingTriggers:
             await self.connection.add_listener('batch_processing_needed', self._on_batch_needed)
             
             self.running = True
+            self._stopped.clear()
             logger.info("Real-time processing triggers started - listening for database events")
             
-            # Keep connection alive
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep connection alive until stop_listening() signals, instead of
+            # waking up every second to poll the running flag
+            await self._stopped.wait()
                 
         except Exception as e:
             logger.error(f"Failed to start real-time triggers: {e}")
@@ -109,6 +111,7 @@ class RealtimeProcessingTriggers:
     async def stop_listening(self) -> None:
         """Stop listening for database notifications."""
         self.running = False
+        self._stopped.set()
         if self.connection:
             await self.connection.close()
             self.connection = None
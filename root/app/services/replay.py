@@ -122,29 +122,29 @@ async def replay_with_rate_limit(
             return 0
         
         success_count = 0
-        delay_between_items = 1.0 / rate_limit_per_second
         
-        # Process items with rate limiting
-        for i, item in enumerate(items):
-            try:
-                success = await _replay_single_item(db, item)
-                
-                if success:
-                    await mark_retry_attempt(db, item, success=True)
-                    success_count += 1
-                else:
+        # Process items in one-second windows of rate_limit_per_second items,
+        # sleeping once per window instead of once per item
+        for start in range(0, len(items), rate_limit_per_second):
+            if start:
+                await asyncio.sleep(1.0)
+            
+            for item in items[start:start + rate_limit_per_second]:
+                try:
+                    success = await _replay_single_item(db, item)
+                    
+                    if success:
+                        await mark_retry_attempt(db, item, success=True)
+                        success_count += 1
+                    else:
+                        await mark_retry_attempt(
+                            db, item, success=False, error_message="Replay failed"
+                        )
+                        
+                except Exception as e:
                     await mark_retry_attempt(
-                        db, item, success=False, error_message="Replay failed"
+                        db, item, success=False, error_message=str(e)
                     )
-                
-                # Rate limiting delay (except for last item)
-                if i < len(items) - 1:
-                    await asyncio.sleep(delay_between_items)
-                    
-            except Exception as e:
-                await mark_retry_attempt(
-                    db, item, success=False, error_message=str(e)
-                )
         
         await db.commit()
         
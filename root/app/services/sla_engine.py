@@ -10,6 +10,7 @@ for logistics operations.
 
 import asyncio
 import datetime as dt
+import functools
 import json
 import os
 from datetime import timezone
@@ -18,6 +19,7 @@ from typing import Dict, List, Optional
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.storage.db import get_session
 from app.storage.models import OrderEvent, ExceptionRecord
 from app.services.policy_loader import get_sla_config, get_reason_code_config
 from app.services.ai_exception_analyst import analyze_exception_or_fallback
@@ -38,6 +40,18 @@ tracer = get_tracer(__name__)
 # ==== BACKGROUND PROCESSING ==== #
 
 
+@functools.lru_cache(maxsize=1)
+def _exception_management_pipeline():
+    """
+    Resolve the exception management flow once per process.
+    
+    The flows package imports app services, so the import stays deferred
+    to avoid a cycle; caching keeps it off the per-exception path.
+    """
+    from flows.legacy.exception_management_flow import exception_management_pipeline
+    return exception_management_pipeline
+
+
 async def process_exception_background(exception_id: int, tenant: str) -> None:
     """
     Process exception in background after creation.
@@ -50,8 +64,7 @@ async def process_exception_background(exception_id: int, tenant: str) -> None:
         tenant (str): Tenant identifier
     """
     try:
-        from flows.exception_management_flow import exception_management_pipeline
-        from app.storage.db import get_session
+        exception_management_pipeline = _exception_management_pipeline()
         
         print(f"🔄 Background processing for exception {exception_id}")
         
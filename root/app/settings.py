@@ -37,6 +37,10 @@ class Settings(BaseSettings):
     # --► DATABASE CONFIGURATION (SUPABASE)
     DATABASE_URL: str
     DIRECT_URL: str | None = None
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
     
     # --► SUPABASE API CONFIGURATION
     SUPABASE_URL: str | None = None
@@ -0,0 +1,59 @@
+"""Shared read queries over order events."""
+
+import datetime as dt
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import Row, Select, and_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.storage.models import OrderEvent
+
+
+@lru_cache(maxsize=64)
+def _order_events_statement(
+    event_types: Optional[Tuple[str, ...]],
+    cols: Tuple[InstrumentedAttribute, ...]
+) -> Select:
+    """Build the tenant/window select once per event type and column shape.
+    
+    Args:
+        event_types: Event types to restrict to, or None for all
+        cols: Columns to project
+        
+    Returns:
+        Select with ``tenant`` and ``since`` left as bind parameters
+    """
+    criteria = [
+        OrderEvent.tenant == bindparam('tenant'),
+        OrderEvent.created_at >= bindparam('since')
+    ]
+    if event_types is not None:
+        criteria.append(OrderEvent.event_type.in_(event_types))
+    
+    return select(*cols).where(and_(*criteria))
+
+
+async def list_order_events(
+    db: AsyncSession,
+    tenant: str,
+    since: dt.datetime,
+    event_types: Optional[Tuple[str, ...]] = None,
+    cols: Tuple[InstrumentedAttribute, ...] = (OrderEvent.order_id,)
+) -> Sequence[Row]:
+    """List a tenant's order events created since a point in time.
+    
+    Args:
+        db: Database session
+        tenant: Tenant identifier
+        since: Only events created at or after this time
+        event_types: Event types to restrict to, or None for all
+        cols: Columns to project; rows carry only these
+        
+    Returns:
+        Projected rows, unordered
+    """
+    stmt = _order_events_statement(event_types, cols)
+    result = await db.execute(stmt, {'tenant': tenant, 'since': since})
+    return result.all()
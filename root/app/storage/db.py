@@ -8,7 +8,7 @@ connection pooling, circuit breaker protection, and session lifecycle
 management for reliable database operations.
 """
 
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import AsyncGenerator
 from uuid import uuid4
 
@@ -19,7 +19,7 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine
 )
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.settings import settings
 from app.observability.metrics import db_connections_active
@@ -74,27 +74,51 @@ def init_database() -> None:
                 return f"__asyncpg_{prefix}_{uuid4().hex}__"
         
         connect_args = {
-            "statement_cache_size": 0,  # Disable statement cache for PgBouncer
-            "connection_class": _UniqueStmtConnection,
             "server_settings": {
                 "application_name": "oktup_api",
                 "timezone": "UTC"
             }
         }
         
+        if is_pooler:
+            # Disable statement cache for PgBouncer
+            connect_args["statement_cache_size"] = 0
+            connect_args["connection_class"] = _UniqueStmtConnection
+        else:
+            # Direct connections keep prepared statements per connection, so
+            # repeated query shapes skip parse/plan on the server
+            connect_args["statement_cache_size"] = 1024
+            connect_args["prepared_statement_cache_size"] = 512
+        
     except ImportError:
         # Fallback if asyncpg not available
         connect_args = {}
     
+    # Use NullPool for PgBouncer to avoid double pooling; otherwise keep a
+    # persistent pool so short-lived sessions reuse established connections
+    if is_pooler:
+        pool_args = {"poolclass": NullPool}
+    else:
+        pool_args = {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+            # LIFO keeps a small hot set of connections in use, so idle
+            # extras age out and busy backends stay cache-warm
+            "pool_use_lifo": True,
+        }
+    
     # Create async engine with proper pooler configuration
     engine = create_async_engine(
         db_url,
         echo=settings.APP_ENV == "dev",
-        # Use NullPool for PgBouncer to avoid double pooling
-        poolclass=NullPool if is_pooler else None,
         # Use AUTOCOMMIT isolation for pooler compatibility
         isolation_level="AUTOCOMMIT" if is_pooler else "READ_COMMITTED",
         connect_args=connect_args,
+        **pool_args,
     )
     
     # Create session factory
@@ -107,6 +131,28 @@ def init_database() -> None:
     )
 
 
+async def warm_pool(connections: int = 3) -> None:
+    """Open pooled connections ahead of a query burst.
+    
+    Checks out ``connections`` physical connections at once and returns them
+    to the pool, so the first tasks of a flow reuse established connections
+    instead of paying connect/TLS handshake latency. No-op for NullPool
+    (pooler) engines, which never retain connections.
+    
+    Args:
+        connections: Number of connections to open concurrently
+    """
+    if engine is None:
+        init_database()
+    
+    if isinstance(engine.pool, NullPool):
+        return
+    
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            await stack.enter_async_context(engine.connect())
+
+
 # @database_resilient("get_session")  # Temporarily disabled for Prefect compatibility
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
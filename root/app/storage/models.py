@@ -5,7 +5,7 @@ from typing import Dict, Any, Optional
 
 from sqlalchemy import (
     String, Integer, JSON, ForeignKey, UniqueConstraint, 
-    Text, DateTime, Float, Index
+    Text, DateTime, Float, Index, Computed, text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -52,6 +52,11 @@ class OrderEvent(Base):
     order_id: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
     occurred_at: Mapped[dt.datetime] = mapped_column(DateTime, nullable=False)
     payload: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    fulfillment_status: Mapped[Optional[str]] = mapped_column(
+        Text,
+        Computed("payload->>'fulfillment_status'", persisted=True),
+        nullable=True
+    )
     created_at: Mapped[dt.datetime] = mapped_column(
         DateTime,
         default=dt.datetime.utcnow,
@@ -64,12 +69,31 @@ class OrderEvent(Base):
         UniqueConstraint("tenant", "source", "event_id", name="uq_event"),
         Index("ix_order_events_tenant_order_occurred", "tenant", "order_id", "occurred_at"),
         Index("ix_order_events_tenant_created", "tenant", "created_at"),
+        Index(
+            "ix_order_events_tenant_type_created", "tenant", "event_type", "created_at",
+            postgresql_include=["order_id"]
+        ),
     )
     
     # Relationships
     tenant_rel = relationship("Tenant", back_populates="order_events")
 
 
+class OrderStatusSummary(Base):
+    """Hourly order event counts by fulfillment status.
+    
+    Maintained by the order_events insert and delete triggers from migration 010 for
+    order_created and order_updated events.
+    """
+    
+    __tablename__ = "order_status_summary"
+    
+    tenant: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.name"), primary_key=True)
+    bucket_start: Mapped[dt.datetime] = mapped_column(DateTime, primary_key=True)
+    fulfillment_status: Mapped[str] = mapped_column(Text, primary_key=True)
+    event_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class ExceptionRecord(Base):
     """SLA breach exceptions with AI analysis."""
     
@@ -119,6 +143,18 @@ class ExceptionRecord(Base):
         Index("ix_exceptions_tenant_reason", "tenant", "reason_code"),
         Index("ix_exceptions_tenant_created", "tenant", "created_at"),
         Index("ix_exceptions_resolution_eligible", "tenant", "status", "resolution_attempts", "resolution_blocked"),
+        Index(
+            "ix_exceptions_tenant_order_active", "tenant", "order_id",
+            postgresql_where=text("status IN ('OPEN', 'IN_PROGRESS')")
+        ),
+        Index(
+            "ix_exceptions_tenant_missing_ai", "tenant",
+            postgresql_where=text("ai_confidence IS NULL")
+        ),
+        Index(
+            "ix_exceptions_tenant_low_confidence", "tenant",
+            postgresql_where=text("ai_confidence < 0.7 AND ai_confidence IS NOT NULL")
+        ),
     )
     
     # Relationships
@@ -203,9 +239,20 @@ class Invoice(Base):
     __table_args__ = (
         Index("ix_invoices_tenant_status", "tenant", "status"),
         Index("ix_invoices_tenant_created", "tenant", "created_at"),
+        Index("uq_invoices_tenant_order", "tenant", "order_id", unique=True),
     )
 
 
+class InvoiceSequence(Base):
+    """Per-tenant monthly invoice number counters."""
+    
+    __tablename__ = "invoice_sequences"
+    
+    tenant: Mapped[str] = mapped_column(String(64), ForeignKey("tenants.name"), primary_key=True)
+    year_month: Mapped[str] = mapped_column(String(6), primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class InvoiceAdjustment(Base):
     """Invoice adjustments from nightly validation."""
     
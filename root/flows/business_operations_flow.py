@@ -28,6 +28,13 @@ from app.services.invoice_generator import InvoiceGeneratorService
 from app.services.billing import BillingService, compute_amount_cents
 from app.services.policy_loader import get_billing_config
 
+# Rows fetched per round trip when scanning invoices for validation
+INVOICE_VALIDATION_BATCH_SIZE = 500
+
+# Event types marking fulfillment progress
+FULFILLED_EVENT_TYPES = frozenset({"order_fulfilled", "package_shipped"})
+PROCESSING_EVENT_TYPES = frozenset({"pick_completed", "pack_completed"})
+
 
 @task(retries=3, retry_delay_seconds=300)
 async def monitor_order_fulfillment(
@@ -50,16 +57,18 @@ async def monitor_order_fulfillment(
     async with get_session() as db:
         cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
         
-        # Get recent order events
-        query = select(OrderEvent).where(
+        # One row per order: its distinct event types and when it was created
+        query = select(
+            func.array_agg(func.distinct(OrderEvent.event_type)).label("event_types"),
+            func.min(OrderEvent.occurred_at).filter(
+                OrderEvent.event_type == "order_created"
+            ).label("created_at")
+        ).where(
             and_(
                 OrderEvent.tenant == tenant,
                 OrderEvent.created_at >= cutoff_time
             )
-        ).order_by(OrderEvent.order_id, OrderEvent.created_at)
-        
-        result = await db.execute(query)
-        events = result.scalars().all()
+        ).group_by(OrderEvent.order_id)
         
         # Group by order_id and analyze status
         orders_by_status = {
@@ -70,36 +79,41 @@ async def monitor_order_fulfillment(
             "stalled": 0
         }
         
-        orders_events = {}
-        for event in events:
-            if event.order_id not in orders_events:
-                orders_events[event.order_id] = []
-            orders_events[event.order_id].append(event)
+        stalled_cutoff = datetime.utcnow() - timedelta(hours=4)
         
-        for order_id, order_events in orders_events.items():
-            event_types = [e.event_type for e in order_events]
-            
-            if "delivered" in event_types:
-                orders_by_status["delivered"] += 1
-            elif "order_fulfilled" in event_types or "package_shipped" in event_types:
-                orders_by_status["fulfilled"] += 1
-            elif any(t in event_types for t in ["pick_completed", "pack_completed"]):
-                orders_by_status["processing"] += 1
-            elif "order_created" in event_types:
-                # Check if stalled (created > 4 hours ago with no progress)
-                created_event = next(e for e in order_events if e.event_type == "order_created")
-                if datetime.utcnow() - created_event.occurred_at > timedelta(hours=4):
-                    orders_by_status["stalled"] += 1
-                else:
-                    orders_by_status["created"] += 1
+        orders = (await db.execute(query)).all()
+        for event_types, created_at in orders:
+            _count_order_status(orders_by_status, set(event_types), created_at, stalled_cutoff)
+        total_orders = len(orders)
         
         return {
-            "total_orders": len(orders_events),
+            "total_orders": total_orders,
             "orders_by_status": orders_by_status,
             "monitoring_period_hours": lookback_hours
         }
 
 
+def _count_order_status(
+    orders_by_status: Dict[str, int],
+    event_types: set,
+    created_at: Optional[datetime],
+    stalled_cutoff: datetime
+) -> None:
+    """Classify one order's fulfillment status and bump its counter."""
+    if "delivered" in event_types:
+        orders_by_status["delivered"] += 1
+    elif not FULFILLED_EVENT_TYPES.isdisjoint(event_types):
+        orders_by_status["fulfilled"] += 1
+    elif not PROCESSING_EVENT_TYPES.isdisjoint(event_types):
+        orders_by_status["processing"] += 1
+    elif created_at is not None:
+        # Check if stalled (created > 4 hours ago with no progress)
+        if created_at < stalled_cutoff:
+            orders_by_status["stalled"] += 1
+        else:
+            orders_by_status["created"] += 1
+
+
 @task(retries=3, retry_delay_seconds=300)
 async def identify_billable_orders(
     tenant: str = "demo-3pl",
@@ -121,43 +135,42 @@ async def identify_billable_orders(
     async with get_session() as db:
         cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
         
-        # Find fulfilled orders without invoices
-        fulfilled_orders_query = text("""
-            SELECT DISTINCT oe.order_id
-            FROM order_events oe
-            WHERE oe.tenant = :tenant
-            AND oe.event_type IN ('order_fulfilled', 'package_shipped', 'delivered')
-            AND oe.created_at >= :cutoff_time
-            AND NOT EXISTS (
-                SELECT 1 FROM invoices i 
-                WHERE i.tenant = :tenant AND i.order_id = oe.order_id
+        # Find fulfilled orders without invoices, each joined to its latest
+        # order_created payload (contains full order data) in one round trip
+        billable_orders_query = text("""
+            WITH billable AS (
+                SELECT DISTINCT oe.order_id
+                FROM order_events oe
+                WHERE oe.tenant = :tenant
+                AND oe.event_type IN ('order_fulfilled', 'package_shipped', 'delivered')
+                AND oe.created_at >= :cutoff_time
+                AND NOT EXISTS (
+                    SELECT 1 FROM invoices i 
+                    WHERE i.tenant = :tenant AND i.order_id = oe.order_id
+                )
             )
+            SELECT b.order_id, created.payload
+            FROM billable b
+            LEFT JOIN LATERAL (
+                SELECT payload FROM order_events 
+                WHERE tenant = :tenant AND order_id = b.order_id 
+                AND event_type = 'order_created'
+                ORDER BY created_at DESC LIMIT 1
+            ) created ON TRUE
         """)
         
         result = await db.execute(
-            fulfilled_orders_query,
+            billable_orders_query,
             {"tenant": tenant, "cutoff_time": cutoff_time}
         )
         
-        billable_orders = []
-        for row in result:
-            # Get the order_created event payload for this order (contains full order data)
-            payload_query = text("""
-                SELECT payload FROM order_events 
-                WHERE tenant = :tenant AND order_id = :order_id 
-                AND event_type = 'order_created'
-                ORDER BY created_at DESC LIMIT 1
-            """)
-            payload_result = await db.execute(
-                payload_query,
-                {"tenant": tenant, "order_id": row.order_id}
-            )
-            payload_row = payload_result.fetchone()
-            
-            billable_orders.append({
+        billable_orders = [
+            {
                 "order_id": row.order_id,
-                "payload": payload_row.payload if payload_row else {}
-            })
+                "payload": row.payload if row.payload is not None else {}
+            }
+            for row in result
+        ]
         
         logger.info(f"Identified {len(billable_orders)} billable orders for tenant {tenant}")
         
@@ -277,46 +290,61 @@ async def validate_invoices(
     async with get_session() as db:
         cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
         
-        # Get recent invoices
-        query = select(Invoice).where(
+        # Get recent invoices - only the columns the checks below read
+        query = select(
+            Invoice.id,
+            Invoice.order_id,
+            Invoice.amount_cents,
+            Invoice.currency
+        ).where(
             and_(
                 Invoice.tenant == tenant,
                 Invoice.created_at >= cutoff_time
             )
-        ).order_by(Invoice.created_at.desc())
-        
-        result = await db.execute(query)
-        invoices = result.scalars().all()
+        ).order_by(Invoice.created_at.desc()).execution_options(
+            yield_per=INVOICE_VALIDATION_BATCH_SIZE
+        )
         
         validation_results = {
-            "total_invoices": len(invoices),
+            "total_invoices": 0,
             "valid_invoices": 0,
             "invalid_invoices": 0,
             "validation_issues": []
         }
         
-        for invoice in invoices:
-            is_valid = True
-            issues = []
+        # Stream in fixed-size partitions so memory stays flat however many
+        # invoices fall inside the lookback window
+        result = await db.stream(query)
+        async for invoices in result.partitions():
+            validation_results["total_invoices"] += len(invoices)
             
-            # Basic validation checks
-            if not invoice.order_id:
-                issues.append("Missing order_id")
-                is_valid = False
+            for invoice in invoices:
+                is_valid = True
+                issues = []
                 
-            if invoice.amount_cents <= 0:
-                issues.append("Invalid amount")
-                is_valid = False
+                # Basic validation checks
+                if not invoice.order_id:
+                    issues.append("Missing order_id")
+                    is_valid = False
+                    
+                if invoice.amount_cents <= 0:
+                    issues.append("Invalid amount")
+                    is_valid = False
+                    
+                if not invoice.currency or len(invoice.currency) != 3:
+                    issues.append("Invalid currency")
+                    is_valid = False
                 
-            if not invoice.currency or len(invoice.currency) != 3:
-                issues.append("Invalid currency")
-                is_valid = False
-            
-            if is_valid:
-                validation_results["valid_invoices"] += 1
-            else:
-                validation_results["invalid_invoices"] += 1
-                validation_results["validation_issues"].extend(issues)
+                if is_valid:
+                    validation_results["valid_invoices"] += 1
+                else:
+                    validation_results["invalid_invoices"] += 1
+                    validation_results["validation_issues"].extend(issues)
+        
+        # Recalculate DRAFT invoices against the current tariff in one
+        # server-side statement
+        tariff_adjustments = await BillingService().generate_tariff_adjustments(db, tenant)
+        logger.info(f"Created {tariff_adjustments['adjustments_created']} tariff adjustments")
         
         validation_success_rate = (
             validation_results["valid_invoices"] / validation_results["total_invoices"]
@@ -325,7 +353,8 @@ async def validate_invoices(
         
         return {
             **validation_results,
-            "validation_success_rate": validation_success_rate
+            "validation_success_rate": validation_success_rate,
+            "tariff_adjustments": tariff_adjustments
         }
 
 
@@ -508,12 +537,7 @@ async def business_operations_flow(
     logger = get_run_logger()
     logger.info(f"Starting business operations flow for tenant {tenant}")
     
-    # Phase 1: Order Fulfillment Monitoring
-    fulfillment_results = await monitor_order_fulfillment(tenant, lookback_hours)
-    
-    # Phase 2: Billing Operations (if enabled)
-    billing_results = {}
-    if enable_billing:
+    async def _run_invoice_pipeline() -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
         # Identify billable orders
         billable_analysis = await identify_billable_orders(tenant, lookback_hours)
         
@@ -523,11 +547,21 @@ async def business_operations_flow(
             tenant
         )
         
-        # Validate invoices
+        # Validate invoices, including the ones just generated
         invoice_validation = await validate_invoices(tenant, lookback_hours)
         
-        # Process billing adjustments
-        adjustment_processing = await process_billing_adjustments(tenant, lookback_hours)
+        return billable_analysis, invoice_generation, invoice_validation
+    
+    # Phases 1 and 2 overlap: fulfillment monitoring and exception-driven
+    # adjustments don't depend on the invoice chain, which stays sequential
+    billing_results = {}
+    if enable_billing:
+        fulfillment_results, invoice_pipeline, adjustment_processing = await asyncio.gather(
+            monitor_order_fulfillment(tenant, lookback_hours),
+            _run_invoice_pipeline(),
+            process_billing_adjustments(tenant, lookback_hours)
+        )
+        billable_analysis, invoice_generation, invoice_validation = invoice_pipeline
         
         billing_results = {
             "billable_analysis": billable_analysis,
@@ -535,6 +569,8 @@ async def business_operations_flow(
             "invoice_validation": invoice_validation,
             "adjustment_processing": adjustment_processing
         }
+    else:
+        fulfillment_results = await monitor_order_fulfillment(tenant, lookback_hours)
     
     # Phase 3: Business Intelligence
     business_metrics = await generate_business_metrics(tenant, lookback_hours)
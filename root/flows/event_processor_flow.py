@@ -10,6 +10,7 @@ retry mechanisms and circuit breaker patterns.
 """
 
 import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
@@ -457,6 +458,7 @@ async def event_processor_flow(
     """
     logger = get_run_logger()
     flow_start_time = datetime.utcnow()
+    flow_start = time.perf_counter()
     flow_correlation_id = f"event_processor_{int(flow_start_time.timestamp())}"
     
     logger.info("Event processor flow started", extra={
@@ -468,7 +470,7 @@ async def event_processor_flow(
     })
     
     # Phase 1: Order Analysis and Exception Detection
-    phase1_start = datetime.utcnow()
+    phase1_start = time.perf_counter()
     logger.info("Starting Phase 1: Order Analysis", extra={
         "tenant": tenant,
         "flow_correlation_id": flow_correlation_id,
@@ -476,7 +478,7 @@ async def event_processor_flow(
     })
     
     order_analysis = await analyze_order_events(tenant, lookback_hours)
-    phase1_duration = (datetime.utcnow() - phase1_start).total_seconds()
+    phase1_duration = time.perf_counter() - phase1_start
     
     logger.info("Phase 1 completed", extra={
         "tenant": tenant,
@@ -488,7 +490,7 @@ async def event_processor_flow(
     })
     
     # Phase 2: SLA Evaluation
-    phase2_start = datetime.utcnow()
+    phase2_start = time.perf_counter()
     logger.info("Starting Phase 2: SLA Evaluation", extra={
         "tenant": tenant,
         "flow_correlation_id": flow_correlation_id,
@@ -496,7 +498,7 @@ async def event_processor_flow(
     })
     
     sla_evaluation = await process_sla_evaluations(tenant, lookback_hours)
-    phase2_duration = (datetime.utcnow() - phase2_start).total_seconds()
+    phase2_duration = time.perf_counter() - phase2_start
     
     logger.info("Phase 2 completed", extra={
         "tenant": tenant,
@@ -512,7 +514,7 @@ async def event_processor_flow(
     phase3_duration = 0
     
     if enable_ai_processing:
-        phase3_start = datetime.utcnow()
+        phase3_start = time.perf_counter()
         logger.info("Starting Phase 3: AI Processing", extra={
             "tenant": tenant,
             "flow_correlation_id": flow_correlation_id,
@@ -520,7 +522,7 @@ async def event_processor_flow(
         })
         
         ai_processing = await process_ai_analysis_queue(tenant)
-        phase3_duration = (datetime.utcnow() - phase3_start).total_seconds()
+        phase3_duration = time.perf_counter() - phase3_start
         
         logger.info("Phase 3 completed", extra={
             "tenant": tenant,
@@ -538,7 +540,7 @@ async def event_processor_flow(
         })
     
     # Calculate total metrics
-    total_flow_duration = (datetime.utcnow() - flow_start_time).total_seconds()
+    total_flow_duration = time.perf_counter() - flow_start
     total_events_processed = (
         order_analysis.get("events_processed", 0) + 
         sla_evaluation.get("orders_evaluated", 0)
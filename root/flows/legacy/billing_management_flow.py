@@ -16,26 +16,48 @@ returns, adjustments, and multi-tenant billing configurations.
 """
 
 import asyncio
+import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
-from decimal import Decimal
 
 from prefect import flow, task, get_run_logger
-from sqlalchemy import select, and_, func, desc, text
+from sqlalchemy import (
+    Integer, String, and_, bindparam, column, desc, func, lambda_stmt,
+    select, true, update, values
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.storage.db import get_session
-from app.storage.models import OrderEvent, Invoice, InvoiceAdjustment, ExceptionRecord
-from app.services.invoice_generator import InvoiceGeneratorService
-from app.services.billing import BillingService, compute_amount_cents
+from app.storage.db import get_session, warm_pool
+from app.storage.models import (
+    OrderEvent,
+    Invoice,
+    InvoiceAdjustment,
+    InvoiceSequence,
+    ExceptionRecord
+)
+from app.services.billing import (
+    BillingService,
+    bulk_insert_adjustments,
+    compute_amount_cents_batch,
+    record_adjustment_metrics
+)
 from app.services.policy_loader import get_billing_config
 # Removed problematic metrics imports - using basic logging
 
+# Billing criteria: every required event plus at least one completion event
+BILLING_REQUIRED_EVENTS = ('order_created',)
+BILLING_COMPLETION_EVENTS = ('order_fulfilled', 'order_shipped', 'order_delivered')
+
+# Exceptions in these states block billing; must match the predicate of the
+# ix_exceptions_tenant_order_active partial index
+BLOCKING_EXCEPTION_STATUSES = ('OPEN', 'IN_PROGRESS')
+
 
 # ==== INVOICE GENERATION TASKS ==== #
 
 
-@task
+@task(persist_result=False)
 async def identify_billable_orders(
     tenant: str = "demo-3pl",
     lookback_hours: int = 24
@@ -65,99 +87,108 @@ async def identify_billable_orders(
     async with get_session() as db:
         cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
         
-        # Get recent order events
-        events_query = select(OrderEvent).where(
+        # Aggregate readiness per order in the database instead of
+        # transferring every event row
+        orders_query = select(
+            OrderEvent.order_id,
+            and_(*(func.bool_or(OrderEvent.event_type == req) for req in BILLING_REQUIRED_EVENTS)).label('has_required'),
+            func.count().label('event_count'),
+            func.count().filter(OrderEvent.event_type.in_(BILLING_COMPLETION_EVENTS)).label('fulfillment_events'),
+            func.count().filter(OrderEvent.event_type.ilike('%exception%')).label('exception_events'),
+            func.max(OrderEvent.created_at).label('completion_date'),
+            func.array_agg(
+                aggregate_order_by(OrderEvent.event_type, OrderEvent.created_at.desc())
+            )[1].label('latest_event')
+        ).where(
             and_(
                 OrderEvent.tenant == tenant,
                 OrderEvent.created_at >= cutoff_time
             )
-        ).order_by(OrderEvent.order_id, OrderEvent.created_at)
+        ).group_by(OrderEvent.order_id).order_by(OrderEvent.order_id)
+        
+        result = await db.execute(orders_query)
+        orders_events = {row.order_id: row for row in result}
         
-        result = await db.execute(events_query)
-        events = result.scalars().all()
+        order_ids = list(orders_events.keys())
+        
+        # Already-invoiced orders and blocking exception counts, one query each;
+        # lambda statements cache their construction and compiled SQL per call site
+        invoiced_query = lambda_stmt(lambda: select(Invoice.order_id).where(
+            and_(
+                Invoice.tenant == tenant,
+                Invoice.order_id.in_(order_ids)
+            )
+        ))
+        invoiced_order_ids = set((await db.execute(invoiced_query)).scalars().all())
         
-        # Group events by order_id
-        orders_events = {}
-        for event in events:
-            if event.order_id not in orders_events:
-                orders_events[event.order_id] = []
-            orders_events[event.order_id].append(event)
+        exceptions_query = lambda_stmt(lambda: select(
+            ExceptionRecord.order_id,
+            func.count(ExceptionRecord.id)
+        ).where(
+            and_(
+                ExceptionRecord.tenant == tenant,
+                ExceptionRecord.order_id.in_(order_ids),
+                # Inlined as literals so the planner can match the partial
+                # index predicate even under a generic prepared plan
+                ExceptionRecord.status.in_(bindparam(
+                    'blocking_statuses', BLOCKING_EXCEPTION_STATUSES,
+                    expanding=True, literal_execute=True
+                ))
+            )
+        ).group_by(ExceptionRecord.order_id))
+        blocking_exception_counts = dict((await db.execute(exceptions_query)).all())
         
         # Analyze each order for billing readiness
         billable_orders = []
         not_ready_orders = []
         
-        for order_id, order_events in orders_events.items():
-            # Check if already invoiced
-            existing_invoice_query = select(Invoice).where(
-                and_(
-                    Invoice.tenant == tenant,
-                    Invoice.order_id == order_id
-                )
-            )
-            invoice_result = await db.execute(existing_invoice_query)
-            existing_invoice = invoice_result.scalar_one_or_none()
-            
-            if existing_invoice:
+        for order_id, order in orders_events.items():
+            if order_id in invoiced_order_ids:
                 continue  # Already invoiced
             
-            # Analyze order events for billing readiness
-            event_types = [e.event_type for e in order_events]
-            latest_event = max(order_events, key=lambda x: x.created_at)
+            has_required = bool(order.has_required)
+            has_completion = order.fulfillment_events > 0
             
-            # Define billing criteria
-            required_events = ['order_created']
-            completion_events = ['order_fulfilled', 'order_shipped', 'order_delivered']
-            
-            has_required = all(req in event_types for req in required_events)
-            has_completion = any(comp in event_types for comp in completion_events)
-            
-            # Check for blocking exceptions
-            exceptions_query = select(ExceptionRecord).where(
-                and_(
-                    ExceptionRecord.tenant == tenant,
-                    ExceptionRecord.order_id == order_id,
-                    ExceptionRecord.status.in_(['OPEN', 'IN_PROGRESS'])
-                )
-            )
-            exceptions_result = await db.execute(exceptions_query)
-            blocking_exceptions = exceptions_result.scalars().all()
+            blocking_exceptions_count = blocking_exception_counts.get(order_id, 0)
             
             # Determine billing readiness
-            if has_required and has_completion and not blocking_exceptions:
+            if has_required and has_completion and not blocking_exceptions_count:
                 # Calculate billable operations
                 operations = {
                     'order_processing': 1,
-                    'fulfillment_events': len([e for e in event_types if e in completion_events]),
-                    'exception_handling': len([e for e in order_events if 'exception' in e.event_type.lower()])
+                    'fulfillment_events': order.fulfillment_events,
+                    'exception_handling': order.exception_events
                 }
                 
-                # Calculate estimated billing amount
-                estimated_amount = compute_amount_cents(operations, tenant)
-                
                 billable_orders.append({
                     'order_id': order_id,
-                    'event_count': len(order_events),
-                    'latest_event': latest_event.event_type,
-                    'completion_date': latest_event.created_at,
+                    'event_count': order.event_count,
+                    'latest_event': order.latest_event,
+                    'completion_date': order.completion_date,
                     'operations': operations,
-                    'estimated_amount_cents': estimated_amount,
                     'billing_ready': True
                 })
             else:
                 not_ready_orders.append({
                     'order_id': order_id,
-                    'event_count': len(order_events),
-                    'latest_event': latest_event.event_type,
+                    'event_count': order.event_count,
+                    'latest_event': order.latest_event,
                     'missing_requirements': {
                         'has_required_events': has_required,
                         'has_completion_events': has_completion,
-                        'blocking_exceptions_count': len(blocking_exceptions)
+                        'blocking_exceptions_count': blocking_exceptions_count
                     },
                     'billing_ready': False
                 })
         
-        total_estimated_revenue = sum(order['estimated_amount_cents'] for order in billable_orders)
+        # Calculate estimated billing amounts for the whole batch at once
+        estimated_amounts = compute_amount_cents_batch(
+            [order['operations'] for order in billable_orders], tenant
+        )
+        for order, estimated_amount in zip(billable_orders, estimated_amounts):
+            order['estimated_amount_cents'] = estimated_amount
+        
+        total_estimated_revenue = sum(estimated_amounts)
         
         logger.info(f"Billing analysis complete: {len(billable_orders)} orders ready for billing, "
                    f"estimated revenue: ${total_estimated_revenue/100:.2f}")
@@ -177,7 +208,7 @@ async def identify_billable_orders(
         }
 
 
-@task
+@task(persist_result=False)
 async def generate_invoices(
     billable_orders: List[Dict[str, Any]],
     tenant: str = "demo-3pl"
@@ -206,7 +237,6 @@ async def generate_invoices(
             'generated_invoices': []
         }
     
-    invoice_service = InvoiceGeneratorService()
     generated_invoices = []
     total_amount_cents = 0
     errors = []
@@ -215,49 +245,104 @@ async def generate_invoices(
         # Get billing configuration
         billing_config = get_billing_config(tenant)
         
-        for order_data in billable_orders:
-            try:
-                # Generate invoice number
-                invoice_number = await _generate_invoice_number(db, tenant)
-                
-                # Create invoice record
-                invoice = Invoice(
-                    tenant=tenant,
-                    order_id=order_data['order_id'],
-                    invoice_number=invoice_number,
-                    amount_cents=order_data['estimated_amount_cents'],
-                    currency=billing_config.get('currency', 'USD'),
-                    billable_ops=order_data['operations'],
-                    status='DRAFT',
-                    invoice_date=datetime.utcnow(),
-                    due_date=datetime.utcnow() + timedelta(days=30),  # 30-day payment terms
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
+        # One timestamp for the whole batch: invoice numbers, dates and audit
+        # fields all agree, even across a month boundary
+        now = datetime.utcnow()
+        due_date = now + timedelta(days=30)  # 30-day payment terms
+        
+        invoice_rows = [
+            {
+                'tenant': tenant,
+                'order_id': order_data['order_id'],
+                'amount_cents': order_data['estimated_amount_cents'],
+                'currency': billing_config.get('currency', 'USD'),
+                'billable_ops': order_data['operations'],
+                'status': 'DRAFT',
+                'invoice_date': now,
+                'due_date': due_date,
+                'created_at': now,
+                'updated_at': now
+            }
+            for order_data in billable_orders
+        ]
+        
+        try:
+            # One multi-row INSERT ... RETURNING instead of a flush per invoice;
+            # orders invoiced meanwhile are skipped by the unique
+            # (tenant, order_id) index instead of failing the whole batch
+            result = await db.execute(
+                pg_insert(Invoice)
+                .on_conflict_do_nothing(index_elements=['tenant', 'order_id'])
+                .returning(Invoice.order_id, Invoice.id),
+                invoice_rows
+            )
+            invoice_ids_by_order = dict(result.all())
+            
+            # Numbers are reserved only for the rows actually inserted, so
+            # orders skipped above leave no gaps in the monthly sequence
+            inserted_order_ids = [
+                order_id for order_id in dict.fromkeys(o['order_id'] for o in billable_orders)
+                if order_id in invoice_ids_by_order
+            ]
+            invoice_numbers_by_order = {}
+            if inserted_order_ids:
+                invoice_numbers = await _reserve_invoice_numbers(db, tenant, len(inserted_order_ids), now)
+                invoice_numbers_by_order = dict(zip(inserted_order_ids, invoice_numbers))
+                numbers = values(
+                    column('id', Integer),
+                    column('invoice_number', String),
+                    name='numbers'
+                ).data([
+                    (invoice_ids_by_order[order_id], invoice_number)
+                    for order_id, invoice_number in invoice_numbers_by_order.items()
+                ])
+                await db.execute(
+                    update(Invoice)
+                    .where(Invoice.id == numbers.c.id)
+                    .values(invoice_number=numbers.c.invoice_number)
+                    .execution_options(synchronize_session=False)
                 )
-                
-                db.add(invoice)
-                await db.flush()  # Get the ID
-                
-                generated_invoices.append({
-                    'invoice_id': invoice.id,
-                    'invoice_number': invoice_number,
-                    'order_id': order_data['order_id'],
-                    'amount_cents': order_data['estimated_amount_cents'],
-                    'operations': order_data['operations']
-                })
-                
-                total_amount_cents += order_data['estimated_amount_cents']
-                
-                logger.info(f"Generated invoice {invoice_number} for order {order_data['order_id']}: "
-                           f"${order_data['estimated_amount_cents']/100:.2f}")
-                
-            except Exception as e:
-                error_msg = f"Failed to generate invoice for order {order_data['order_id']}: {str(e)}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+            
+        except Exception as e:
+            # The transaction is aborted; roll back so the reserved invoice
+            # numbers are released rather than committed unused
+            await db.rollback()
+            error_msg = f"Failed to generate invoices for {len(invoice_rows)} orders: {str(e)}"
+            logger.error(error_msg)
+            errors.append(error_msg)
+            invoice_ids_by_order = {}
+            invoice_numbers_by_order = {}
+        
+        if not errors and len(invoice_ids_by_order) < len(invoice_rows):
+            logger.info(f"Skipped {len(invoice_rows) - len(invoice_ids_by_order)} "
+                       f"orders that were already invoiced")
+        
+        # Per-invoice lines are DEBUG only; the summary below stays at INFO
+        log_each_invoice = logger.isEnabledFor(logging.DEBUG)
+        
+        for order_data in billable_orders:
+            invoice_id = invoice_ids_by_order.get(order_data['order_id'])
+            if invoice_id is None:
                 continue
+            invoice_number = invoice_numbers_by_order[order_data['order_id']]
+            
+            generated_invoices.append({
+                'invoice_id': invoice_id,
+                'invoice_number': invoice_number,
+                'order_id': order_data['order_id'],
+                'amount_cents': order_data['estimated_amount_cents'],
+                'operations': order_data['operations']
+            })
+            
+            total_amount_cents += order_data['estimated_amount_cents']
+            
+            if log_each_invoice:
+                logger.debug("Generated invoice %s for order %s: $%.2f",
+                             invoice_number, order_data['order_id'],
+                             order_data['estimated_amount_cents'] / 100)
         
-        await db.commit()
+        if not errors:
+            await db.commit()
     
     logger.info(f"Invoice generation complete: {len(generated_invoices)} invoices generated, "
                f"total amount: ${total_amount_cents/100:.2f}")
@@ -271,199 +356,46 @@ async def generate_invoices(
     }
 
 
-@task
-async def validate_invoice_accuracy(
+@task(persist_result=False)
+async def validate_and_adjust_invoices(
     generated_invoices: List[Dict[str, Any]],
     tenant: str = "demo-3pl"
-) -> Dict[str, Any]:
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Validate invoice accuracy by recalculating amounts from source data.
+    Validate invoices and apply resulting adjustments in one transaction.
     
-    This task implements financial controls by independently verifying
-    invoice amounts against actual order events and operations performed.
+    Recalculates every invoice from its order events, records adjustments
+    for those that drifted, applies them and moves the invoices out of
+    DRAFT, all in a single session and commit.
     
     Args:
         generated_invoices: List of generated invoice data
         tenant: Tenant context
         
     Returns:
-        Dict with validation results and any required adjustments
+        Tuple of (validation results, adjustment processing results)
     """
     logger = get_run_logger()
-    logger.info(f"Validating accuracy of {len(generated_invoices)} invoices")
+    logger.info(f"Validating and adjusting {len(generated_invoices)} invoices")
     
     if not generated_invoices:
-        return {
-            'tenant': tenant,
-            'invoices_validated': 0,
-            'adjustments_needed': 0,
-            'validation_results': []
-        }
-    
-    billing_service = BillingService()
-    validation_results = []
-    adjustments_needed = 0
-    total_adjustment_cents = 0
-    
-    async with get_session() as db:
-        for invoice_data in generated_invoices:
-            try:
-                # Get the invoice record
-                invoice_query = select(Invoice).where(Invoice.id == invoice_data['invoice_id'])
-                result = await db.execute(invoice_query)
-                invoice = result.scalar_one()
-                
-                # Validate the invoice
-                adjustment = await billing_service.validate_invoice(db, invoice)
-                
-                validation_result = {
-                    'invoice_id': invoice.id,
-                    'invoice_number': invoice.invoice_number,
-                    'order_id': invoice.order_id,
-                    'original_amount_cents': invoice.amount_cents,
-                    'validation_passed': adjustment is None
-                }
-                
-                if adjustment:
-                    # Add adjustment to database
-                    db.add(adjustment)
-                    adjustments_needed += 1
-                    total_adjustment_cents += abs(adjustment.delta_cents)
-                    
-                    validation_result.update({
-                        'adjustment_needed': True,
-                        'adjustment_amount_cents': adjustment.delta_cents,
-                        'adjustment_reason': adjustment.reason,
-                        'corrected_amount_cents': invoice.amount_cents + adjustment.delta_cents
-                    })
-                    
-                    logger.warning(f"Invoice {invoice.invoice_number} requires adjustment: "
-                                 f"${adjustment.delta_cents/100:.2f}")
-                else:
-                    validation_result['adjustment_needed'] = False
-                
-                validation_results.append(validation_result)
-                
-            except Exception as e:
-                logger.error(f"Failed to validate invoice {invoice_data['invoice_id']}: {str(e)}")
-                validation_results.append({
-                    'invoice_id': invoice_data['invoice_id'],
-                    'validation_passed': False,
-                    'error': str(e)
-                })
-        
-        await db.commit()
-    
-    validation_rate = len([r for r in validation_results if r.get('validation_passed', False)]) / len(validation_results)
-    
-    logger.info(f"Invoice validation complete: {validation_rate:.1%} passed validation, "
-               f"{adjustments_needed} adjustments needed")
-    
-    return {
-        'tenant': tenant,
-        'invoices_validated': len(validation_results),
-        'validation_success_rate': validation_rate,
-        'adjustments_needed': adjustments_needed,
-        'total_adjustment_amount_cents': total_adjustment_cents,
-        'validation_results': validation_results
-    }
-
-
-@task
-async def process_billing_adjustments(
-    validation_results: Dict[str, Any],
-    tenant: str = "demo-3pl"
-) -> Dict[str, Any]:
-    """
-    Process billing adjustments and update invoice statuses.
-    
-    This task handles the financial reconciliation process by applying
-    approved adjustments and updating invoice statuses for billing.
-    
-    Args:
-        validation_results: Output from validate_invoice_accuracy
-        tenant: Tenant context
-        
-    Returns:
-        Dict with adjustment processing results
-    """
-    logger = get_run_logger()
-    logger.info(f"Processing billing adjustments for tenant {tenant}")
-    
-    validation_data = validation_results.get('validation_results', [])
-    adjustments_to_process = [r for r in validation_data if r.get('adjustment_needed', False)]
-    
-    if not adjustments_to_process:
-        return {
-            'tenant': tenant,
-            'adjustments_processed': 0,
-            'invoices_finalized': len(validation_data),
-            'total_revenue_impact_cents': 0
-        }
-    
-    processed_adjustments = 0
-    total_revenue_impact_cents = 0
-    finalized_invoices = 0
+        validation_results = _empty_validation_results(tenant)
+        return validation_results, _empty_adjustment_results(validation_results, tenant)
     
     async with get_session() as db:
-        for adjustment_data in adjustments_to_process:
-            try:
-                # Get the invoice
-                invoice_query = select(Invoice).where(Invoice.id == adjustment_data['invoice_id'])
-                result = await db.execute(invoice_query)
-                invoice = result.scalar_one()
-                
-                # Apply the adjustment to the invoice amount
-                adjustment_cents = adjustment_data['adjustment_amount_cents']
-                invoice.amount_cents += adjustment_cents
-                invoice.updated_at = datetime.utcnow()
-                
-                # Add note about adjustment
-                if not invoice.notes:
-                    invoice.notes = ""
-                invoice.notes += f"\nAdjustment applied: ${adjustment_cents/100:.2f} - {adjustment_data.get('adjustment_reason', 'Validation correction')}"
-                
-                processed_adjustments += 1
-                total_revenue_impact_cents += adjustment_cents
-                
-                logger.info(f"Applied adjustment to invoice {invoice.invoice_number}: "
-                           f"${adjustment_cents/100:.2f}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process adjustment for invoice {adjustment_data['invoice_id']}: {str(e)}")
-                continue
+        validation_results = await _validate_invoices(db, generated_invoices, tenant, logger)
         
-        # Finalize all validated invoices (move from DRAFT to PENDING)
-        for result_data in validation_data:
-            try:
-                invoice_query = select(Invoice).where(Invoice.id == result_data['invoice_id'])
-                result = await db.execute(invoice_query)
-                invoice = result.scalar_one()
-                
-                if invoice.status == 'DRAFT':
-                    invoice.status = 'PENDING'
-                    invoice.updated_at = datetime.utcnow()
-                    finalized_invoices += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to finalize invoice {result_data['invoice_id']}: {str(e)}")
-                continue
+        if _has_adjustments(validation_results):
+            adjustment_results = await _apply_billing_adjustments(db, validation_results, tenant, logger)
+        else:
+            adjustment_results = _empty_adjustment_results(validation_results, tenant)
         
         await db.commit()
     
-    logger.info(f"Adjustment processing complete: {processed_adjustments} adjustments applied, "
-               f"{finalized_invoices} invoices finalized")
-    
-    return {
-        'tenant': tenant,
-        'adjustments_processed': processed_adjustments,
-        'invoices_finalized': finalized_invoices,
-        'total_revenue_impact_cents': total_revenue_impact_cents,
-        'net_revenue_adjustment': total_revenue_impact_cents / 100
-    }
+    return validation_results, adjustment_results
 
 
-@task
+@task(persist_result=False)
 async def generate_billing_report(
     billing_results: Dict[str, Any],
     tenant: str = "demo-3pl"
@@ -484,40 +416,90 @@ async def generate_billing_report(
     logger = get_run_logger()
     logger.info(f"Generating billing report for tenant {tenant}")
     
+    current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # Both reads see the committed post-adjustment state and are independent,
+    # so overlap them on separate sessions
+    async with asyncio.TaskGroup() as tg:
+        monthly_task = tg.create_task(_fetch_monthly_billing_stats(tenant, current_month_start))
+        status_task = tg.create_task(_fetch_invoice_status_breakdown(tenant))
+    
+    monthly_stats = adjustment_stats = monthly_task.result()
+    status_breakdown = status_task.result()
+    
+    # Compile comprehensive report
+    report = {
+        'tenant': tenant,
+        'report_date': datetime.utcnow().isoformat(),
+        'reporting_period': 'current_month',
+        'current_billing_cycle': {
+            'invoices_generated': billing_results.get('invoices_generated', 0),
+            'total_amount_cents': billing_results.get('total_amount_cents', 0),
+            'adjustments_processed': billing_results.get('adjustments_processed', 0),
+            'revenue_impact_cents': billing_results.get('total_revenue_impact_cents', 0)
+        },
+        'monthly_statistics': {
+            'total_invoices': monthly_stats.invoice_count or 0,
+            'total_revenue_cents': monthly_stats.total_amount_cents or 0,
+            'average_invoice_cents': monthly_stats.avg_amount_cents or 0,
+            'total_adjustments': adjustment_stats.adjustment_count or 0,
+            'total_adjustment_amount_cents': adjustment_stats.total_adjustment_cents or 0
+        },
+        'invoice_status_breakdown': status_breakdown,
+        'financial_metrics': {
+            'gross_revenue': (monthly_stats.total_amount_cents or 0) / 100,
+            'net_adjustments': (adjustment_stats.total_adjustment_cents or 0) / 100,
+            'net_revenue': ((monthly_stats.total_amount_cents or 0) + (adjustment_stats.total_adjustment_cents or 0)) / 100,
+            'adjustment_rate': (adjustment_stats.adjustment_count or 0) / (monthly_stats.invoice_count or 1),
+            'average_invoice_value': (monthly_stats.avg_amount_cents or 0) / 100
+        }
+    }
+    
+    logger.info(f"Billing report generated: ${report['financial_metrics']['net_revenue']:.2f} net revenue, "
+               f"{report['monthly_statistics']['total_invoices']} invoices this month")
+    
+    return report
+
+
+# ==== HELPER FUNCTIONS ==== #
+
+
+async def _fetch_monthly_billing_stats(tenant: str, since: datetime) -> Any:
+    """Fetch invoice and adjustment aggregates for tenant since a date."""
     async with get_session() as db:
-        # Get current period statistics
-        current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        # Monthly invoice statistics
-        monthly_invoices_query = select(
+        # Two single-row aggregates joined into one round trip
+        monthly_invoices = select(
             func.count(Invoice.id).label('invoice_count'),
             func.sum(Invoice.amount_cents).label('total_amount_cents'),
             func.avg(Invoice.amount_cents).label('avg_amount_cents')
         ).where(
             and_(
                 Invoice.tenant == tenant,
-                Invoice.created_at >= current_month_start
+                Invoice.created_at >= since
             )
-        )
-        
-        result = await db.execute(monthly_invoices_query)
-        monthly_stats = result.first()
+        ).subquery()
         
-        # Adjustment statistics
-        adjustments_query = select(
+        monthly_adjustments = select(
             func.count(InvoiceAdjustment.id).label('adjustment_count'),
             func.sum(InvoiceAdjustment.delta_cents).label('total_adjustment_cents')
         ).join(Invoice).where(
             and_(
                 Invoice.tenant == tenant,
-                InvoiceAdjustment.created_at >= current_month_start
+                InvoiceAdjustment.created_at >= since
             )
-        )
+        ).subquery()
         
-        result = await db.execute(adjustments_query)
-        adjustment_stats = result.first()
+        monthly_query = select(monthly_invoices, monthly_adjustments).select_from(
+            monthly_invoices.join(monthly_adjustments, true())
+        )
         
-        # Status breakdown
+        result = await db.execute(monthly_query)
+        return result.first()
+
+
+async def _fetch_invoice_status_breakdown(tenant: str) -> Dict[str, Dict[str, Any]]:
+    """Fetch invoice count and amount per status for tenant."""
+    async with get_session() as db:
         status_query = select(
             Invoice.status,
             func.count(Invoice.id).label('count'),
@@ -525,65 +507,222 @@ async def generate_billing_report(
         ).where(Invoice.tenant == tenant).group_by(Invoice.status)
         
         result = await db.execute(status_query)
-        status_breakdown = {row.status: {'count': row.count, 'amount_cents': row.amount_cents} 
-                          for row in result}
+        return {row.status: {'count': row.count, 'amount_cents': row.amount_cents}
+                for row in result}
+
+
+async def _reserve_invoice_numbers(
+    db: AsyncSession,
+    tenant: str,
+    count: int,
+    now: datetime
+) -> List[str]:
+    """Atomically reserve a contiguous block of invoice numbers for tenant."""
+    year_month = now.strftime("%Y%m")
+    
+    # Upsert bumps the monthly counter by the whole block in one statement
+    stmt = pg_insert(InvoiceSequence).values(
+        tenant=tenant,
+        year_month=year_month,
+        last_value=count
+    ).on_conflict_do_update(
+        index_elements=['tenant', 'year_month'],
+        set_={'last_value': InvoiceSequence.last_value + count}
+    ).returning(InvoiceSequence.last_value)
+    
+    last_value = (await db.execute(stmt)).scalar_one()
+    first_value = last_value - count + 1
+    
+    return [f"{tenant.upper()}-{year_month}-{seq:04d}" for seq in range(first_value, last_value + 1)]
+
+
+async def _validate_invoices(
+    db: AsyncSession,
+    generated_invoices: List[Dict[str, Any]],
+    tenant: str,
+    logger
+) -> Dict[str, Any]:
+    """Recalculate invoices and bulk-insert adjustments within the caller's transaction."""
+    billing_service = BillingService()
+    validation_results = []
+    adjustment_rows = []
+    total_adjustment_cents = 0
+    
+    # Every invoice is recalculated from its order events: the amount stored
+    # at creation is the one under test, so it cannot be used to skip any
+    invoice_ids = [invoice_data['invoice_id'] for invoice_data in generated_invoices]
+    invoice_query = lambda_stmt(lambda: select(
+        Invoice.id,
+        Invoice.tenant,
+        Invoice.order_id,
+        Invoice.invoice_number,
+        Invoice.amount_cents
+    ).where(Invoice.id.in_(invoice_ids)))
+    result = await db.execute(invoice_query)
+    invoices = result.all()
+    
+    found_ids = {invoice.id for invoice in invoices}
+    for invoice_data in generated_invoices:
+        if invoice_data['invoice_id'] not in found_ids:
+            logger.error("Failed to validate invoice %s: invoice not found", invoice_data['invoice_id'])
+            validation_results.append({
+                'invoice_id': invoice_data['invoice_id'],
+                'validation_passed': False,
+                'error': 'Invoice not found'
+            })
+    
+    # Recalculate the whole batch at once; adjustments are written in bulk below
+    adjustments = await billing_service.calculate_invoice_adjustments(db, invoices)
+    
+    for invoice in invoices:
+        adjustment = adjustments.get(invoice.id)
         
-        # Compile comprehensive report
-        report = {
-            'tenant': tenant,
-            'report_date': datetime.utcnow().isoformat(),
-            'reporting_period': 'current_month',
-            'current_billing_cycle': {
-                'invoices_generated': billing_results.get('invoices_generated', 0),
-                'total_amount_cents': billing_results.get('total_amount_cents', 0),
-                'adjustments_processed': billing_results.get('adjustments_processed', 0),
-                'revenue_impact_cents': billing_results.get('total_revenue_impact_cents', 0)
-            },
-            'monthly_statistics': {
-                'total_invoices': monthly_stats.invoice_count or 0,
-                'total_revenue_cents': monthly_stats.total_amount_cents or 0,
-                'average_invoice_cents': monthly_stats.avg_amount_cents or 0,
-                'total_adjustments': adjustment_stats.adjustment_count or 0,
-                'total_adjustment_amount_cents': adjustment_stats.total_adjustment_cents or 0
-            },
-            'invoice_status_breakdown': status_breakdown,
-            'financial_metrics': {
-                'gross_revenue': (monthly_stats.total_amount_cents or 0) / 100,
-                'net_adjustments': (adjustment_stats.total_adjustment_cents or 0) / 100,
-                'net_revenue': ((monthly_stats.total_amount_cents or 0) + (adjustment_stats.total_adjustment_cents or 0)) / 100,
-                'adjustment_rate': (adjustment_stats.adjustment_count or 0) / (monthly_stats.invoice_count or 1),
-                'average_invoice_value': (monthly_stats.avg_amount_cents or 0) / 100
-            }
+        validation_result = {
+            'invoice_id': invoice.id,
+            'invoice_number': invoice.invoice_number,
+            'order_id': invoice.order_id,
+            'original_amount_cents': invoice.amount_cents,
+            'validation_passed': adjustment is None
         }
         
-        logger.info(f"Billing report generated: ${report['financial_metrics']['net_revenue']:.2f} net revenue, "
-                   f"{report['monthly_statistics']['total_invoices']} invoices this month")
+        if adjustment:
+            adjustment_rows.append(adjustment)
+            total_adjustment_cents += abs(adjustment['delta_cents'])
+            
+            validation_result.update({
+                'adjustment_needed': True,
+                'adjustment_amount_cents': adjustment['delta_cents'],
+                'adjustment_reason': adjustment['reason'],
+                'corrected_amount_cents': invoice.amount_cents + adjustment['delta_cents']
+            })
+            
+            logger.warning("Invoice %s requires adjustment: $%.2f",
+                           invoice.invoice_number, adjustment['delta_cents'] / 100)
+        else:
+            validation_result['adjustment_needed'] = False
         
-        return report
-
-
-# ==== HELPER FUNCTIONS ==== #
+        validation_results.append(validation_result)
+    
+    # One COPY (or executemany INSERT) instead of one ORM flush per adjustment
+    if adjustment_rows:
+        await bulk_insert_adjustments(
+            db,
+            [billing_service.build_adjustment_row(a) for a in adjustment_rows]
+        )
+        record_adjustment_metrics(adjustment_rows)
+    
+    adjustments_needed = len(adjustment_rows)
+    validation_rate = len([r for r in validation_results if r.get('validation_passed', False)]) / len(validation_results)
+    
+    logger.info(f"Invoice validation complete: {validation_rate:.1%} passed validation, "
+               f"{adjustments_needed} adjustments needed")
+    
+    return {
+        'tenant': tenant,
+        'invoices_validated': len(validation_results),
+        'validation_success_rate': validation_rate,
+        'adjustments_needed': adjustments_needed,
+        'total_adjustment_amount_cents': total_adjustment_cents,
+        'validation_results': validation_results
+    }
 
 
-async def _generate_invoice_number(db: AsyncSession, tenant: str) -> str:
-    """Generate unique invoice number for tenant."""
-    # Get current year and month
+async def _apply_billing_adjustments(
+    db: AsyncSession,
+    validation_results: Dict[str, Any],
+    tenant: str,
+    logger
+) -> Dict[str, Any]:
+    """Apply adjustments and finalize invoices within the caller's transaction."""
+    validation_data = validation_results.get('validation_results', [])
+    adjustments_to_process = [r for r in validation_data if r.get('adjustment_needed', False)]
+    
     now = datetime.utcnow()
-    year_month = now.strftime("%Y%m")
     
-    # Get next sequence number for this month
-    query = text("""
-        SELECT COALESCE(MAX(CAST(SUBSTRING(invoice_number FROM '[0-9]+$') AS INTEGER)), 0) + 1
-        FROM invoices 
-        WHERE tenant = :tenant 
-        AND invoice_number LIKE :pattern
-    """)
+    # Apply every adjustment delta with one UPDATE ... FROM (VALUES ...)
+    applied_ids = set()
+    if adjustments_to_process:
+        deltas = values(
+            column('id', Integer),
+            column('delta_cents', Integer),
+            name='deltas'
+        ).data([
+            (r['invoice_id'], r['adjustment_amount_cents']) for r in adjustments_to_process
+        ])
+        result = await db.execute(
+            update(Invoice)
+            .where(Invoice.id == deltas.c.id)
+            .values(amount_cents=Invoice.amount_cents + deltas.c.delta_cents, updated_at=now)
+            .returning(Invoice.id)
+            .execution_options(synchronize_session=False)
+        )
+        applied_ids = set(result.scalars().all())
     
-    pattern = f"{tenant.upper()}-{year_month}-%"
-    result = await db.execute(query, {"tenant": tenant, "pattern": pattern})
-    next_seq = result.scalar()
+    processed_adjustments = 0
+    total_revenue_impact_cents = 0
+    log_each_adjustment = logger.isEnabledFor(logging.DEBUG)
+    for adjustment_data in adjustments_to_process:
+        adjustment_cents = adjustment_data['adjustment_amount_cents']
+        if adjustment_data['invoice_id'] not in applied_ids:
+            logger.error("Failed to process adjustment for invoice %s: invoice not found",
+                         adjustment_data['invoice_id'])
+            continue
+        
+        processed_adjustments += 1
+        total_revenue_impact_cents += adjustment_cents
+        
+        if log_each_adjustment:
+            logger.debug("Applied adjustment to invoice %s: $%.2f",
+                         adjustment_data['invoice_number'], adjustment_cents / 100)
+    
+    # Finalize all validated invoices (move from DRAFT to PENDING) in one UPDATE
+    invoice_ids = [r['invoice_id'] for r in validation_data]
+    result = await db.execute(
+        update(Invoice)
+        .where(and_(Invoice.id.in_(invoice_ids), Invoice.status == 'DRAFT'))
+        .values(status='PENDING', updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    finalized_invoices = result.rowcount
     
-    return f"{tenant.upper()}-{year_month}-{next_seq:04d}"
+    logger.info(f"Adjustment processing complete: {processed_adjustments} adjustments applied "
+               f"(${total_revenue_impact_cents/100:.2f}), {finalized_invoices} invoices finalized")
+    
+    return {
+        'tenant': tenant,
+        'adjustments_processed': processed_adjustments,
+        'invoices_finalized': finalized_invoices,
+        'total_revenue_impact_cents': total_revenue_impact_cents,
+        'net_revenue_adjustment': total_revenue_impact_cents / 100
+    }
+
+
+def _empty_validation_results(tenant: str) -> Dict[str, Any]:
+    """Validation results for a run with no invoices."""
+    return {
+        'tenant': tenant,
+        'invoices_validated': 0,
+        'adjustments_needed': 0,
+        'validation_results': []
+    }
+
+
+def _has_adjustments(validation_results: Dict[str, Any]) -> bool:
+    """Check whether any validated invoice needs an adjustment."""
+    return any(
+        r.get('adjustment_needed', False)
+        for r in validation_results.get('validation_results', [])
+    )
+
+
+def _empty_adjustment_results(validation_results: Dict[str, Any], tenant: str) -> Dict[str, Any]:
+    """Adjustment results when no invoice needs an adjustment."""
+    return {
+        'tenant': tenant,
+        'adjustments_processed': 0,
+        'invoices_finalized': len(validation_results.get('validation_results', [])),
+        'total_revenue_impact_cents': 0
+    }
 
 
 # ==== MAIN FLOW ==== #
@@ -614,6 +753,14 @@ async def billing_management_pipeline(
     logger = get_run_logger()
     logger.info(f"Starting billing management pipeline for tenant {tenant}")
     
+    # Reload tariffs once per run; every lookup inside the run then hits
+    # get_billing_config's per-tenant lru_cache
+    get_billing_config.cache_clear()
+    
+    # Open pooled connections up front so the first task queries don't pay
+    # connection setup latency
+    await warm_pool()
+    
     # Step 1: Identify orders ready for billing
     billable_analysis = await identify_billable_orders(tenant, lookback_hours)
     
@@ -623,19 +770,16 @@ async def billing_management_pipeline(
         tenant
     )
     
-    # Step 3: Validate invoice accuracy
-    validation_results = await validate_invoice_accuracy(
+    # Steps 3-4: Validate invoice accuracy and process billing adjustments
+    # in a single transaction
+    validation_results, adjustment_results = await validate_and_adjust_invoices(
         invoice_generation['generated_invoices'], 
         tenant
     )
     
-    # Step 4: Process billing adjustments
-    adjustment_results = await process_billing_adjustments(
-        validation_results, 
-        tenant
-    )
-    
-    # Step 5: Generate comprehensive billing report
+    # Step 5: Generate comprehensive billing report. Runs after the
+    # adjustment transaction commits so its aggregates include the deltas;
+    # its independent reads overlap inside the task.
     billing_report = await generate_billing_report(
         {
             **invoice_generation,
@@ -680,16 +824,37 @@ if __name__ == "__main__":
     parser.add_argument("--tenant", default="demo-3pl", help="Tenant to process")
     parser.add_argument("--hours", type=int, default=24, help="Lookback hours for billable orders")
     parser.add_argument("--run", action="store_true", help="Run the flow immediately")
-    parser.add_argument("--serve", action="store_true", help="Serve the flow for scheduling")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve the flow for scheduling (blocking, must own the process)")
+    parser.add_argument("--serve-async", action="store_true",
+                        help="Serve the flow without blocking the event loop")
     
     args = parser.parse_args()
     
+    serve_kwargs = {
+        "name": "local-billing-management",
+        "parameters": {"tenant": args.tenant, "lookback_hours": args.hours},
+    }
+    
     if args.run:
         # Run the flow immediately
         asyncio.run(billing_management_pipeline(args.tenant, args.hours))
     elif args.serve:
-        # Serve the flow for scheduling
+        # Blocking entrypoint: serve() owns the main thread until interrupted,
+        # so nothing else may share this process.
         print(f"Serving billing management pipeline for tenant {args.tenant}")
-        print("This would set up a scheduled deployment in a real environment")
+        billing_management_pipeline.serve(**serve_kwargs)
+    elif args.serve_async:
+        async def _serve_async() -> None:
+            # Prefer the native coroutine; fall back to a worker thread so the
+            # blocking serve loop never starves other coroutines on this loop.
+            aserve = getattr(billing_management_pipeline, "aserve", None)
+            if aserve is not None:
+                await aserve(**serve_kwargs)
+            else:
+                await asyncio.to_thread(billing_management_pipeline.serve, **serve_kwargs)
+        
+        print(f"Serving billing management pipeline for tenant {args.tenant} (async)")
+        asyncio.run(_serve_async())
     else:
-        print("Use --run to execute immediately or --serve to set up scheduling")
+        print("Use --run to execute immediately, --serve or --serve-async to set up scheduling")
@@ -8,11 +8,17 @@ ensuring systematic reprocessing of failed enrichment, completeness tracking,
 and robust failure recovery mechanisms.
 """
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
 from prefect import flow, task, get_run_logger
-from sqlalchemy import select, and_, func
+from sqlalchemy import BigInteger, case, cast, column, func, select, table
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.storage.db import get_session
@@ -20,6 +26,87 @@ from app.storage.models import ExceptionRecord
 from app.services.data_enrichment_pipeline import get_enrichment_pipeline
 
 
+# Backlog analyses are reused for this long, so adjacent scheduled and manual
+# runs share one set of counts per tenant
+BACKLOG_CACHE_TTL_SECONDS = 60.0
+
+_backlog_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_backlog_cache_stats = {"hits": 0, "misses": 0}
+
+# Tenant sub-flows run concurrently by scheduled_enrichment_maintenance
+MAX_CONCURRENT_TENANTS = 2
+
+# Alert and notification skeletons; "message" is filled in per call and keeps
+# its position in the key order
+_QUALITY_BELOW_THRESHOLD_ALERT = MappingProxyType({
+    "level": "CRITICAL",
+    "title": "Data Enrichment Quality Below Threshold",
+    "message": None,
+    "action_required": "Immediate investigation of AI service performance required"
+})
+_LOW_SUCCESS_RATE_ALERT = MappingProxyType({
+    "level": "HIGH",
+    "title": "Low Enrichment Success Rate",
+    "message": None,
+    "action_required": "Review error patterns and improve pipeline reliability"
+})
+_MULTIPLE_ISSUES_ALERT = MappingProxyType({
+    "level": "WARNING",
+    "title": "Multiple Enrichment Issues Detected",
+    "message": None,
+    "action_required": "Review and address identified issues"
+})
+_EXCELLENT_QUALITY_NOTIFICATION = MappingProxyType({
+    "level": "SUCCESS",
+    "title": "Excellent Enrichment Quality",
+    "message": None
+})
+
+# Backlog priority by records needing enrichment (strictly greater than),
+# checked in order; anything below the last threshold is LOW
+BACKLOG_PRIORITY_THRESHOLDS = ((1000, "CRITICAL"), (500, "HIGH"), (100, "MEDIUM"))
+
+# Above this many rows in the exceptions table the tenant total is estimated
+# from pg_class.reltuples times the tenant's share, refreshed daily by an
+# exact count
+EXACT_TOTAL_MAX_ROWS = 1_000_000
+TENANT_SHARE_TTL_SECONDS = 24 * 60 * 60
+
+_tenant_share_cache: Dict[str, Tuple[float, float]] = {}
+
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+_EXCEPTIONS_ROW_ESTIMATE = select(
+    cast(_pg_class.c.reltuples, BigInteger)
+).where(
+    _pg_class.c.oid == func.to_regclass(ExceptionRecord.__tablename__)
+).scalar_subquery()
+
+
+# Session opened once by data_enrichment_flow and shared by its tasks
+_flow_session: ContextVar[Optional[AsyncSession]] = ContextVar("enrichment_flow_session", default=None)
+
+
+@asynccontextmanager
+async def _enrichment_session() -> AsyncIterator[AsyncSession]:
+    """Yield the enclosing flow's session, or a new one outside a flow."""
+    db = _flow_session.get()
+    if db is not None:
+        yield db
+    else:
+        async with get_session() as db:
+            yield db
+
+
+_pipeline_record_counts = itemgetter("records_processed", "records_completed")
+
+
+def _tenant_count(tenant: str, *criteria: Any) -> Any:
+    """Build a scalar COUNT(*) subquery over a tenant's exception records."""
+    return select(func.count()).where(
+        ExceptionRecord.tenant == tenant, *criteria
+    ).scalar_subquery()
+
+
 # ==== ENRICHMENT TASKS ==== #
 
 @task
@@ -28,7 +115,14 @@ async def analyze_enrichment_backlog(tenant: str = "demo-3pl") -> Dict[str, Any]
     Analyze the current enrichment backlog for a tenant.
     
     Identifies records that need enrichment or reprocessing and provides
-    statistics on data completeness and enrichment quality.
+    statistics on data completeness and enrichment quality. Results are
+    cached in-process per tenant for BACKLOG_CACHE_TTL_SECONDS.
+    
+    The unenriched and low-confidence subsets are covered by the partial
+    indexes ix_exceptions_tenant_missing_ai and
+    ix_exceptions_tenant_low_confidence (migration 009). On tables larger
+    than EXACT_TOTAL_MAX_ROWS the tenant total is estimated (see
+    total_records_estimated) rather than counted.
     
     Args:
         tenant (str): Tenant identifier
@@ -37,75 +131,109 @@ async def analyze_enrichment_backlog(tenant: str = "demo-3pl") -> Dict[str, Any]
         Dict[str, Any]: Backlog analysis with statistics and priorities
     """
     logger = get_run_logger()
-    logger.info(f"Analyzing enrichment backlog for tenant {tenant}")
     
-    async with get_session() as db:
-        # Total records
-        total_query = select(func.count()).where(ExceptionRecord.tenant == tenant)
-        total_result = await db.execute(total_query)
-        total_records = total_result.scalar() or 0
-        
-        # Records missing AI classification
-        missing_classification_query = select(func.count()).where(
-            and_(
-                ExceptionRecord.tenant == tenant,
-                ExceptionRecord.ai_confidence.is_(None)
-            )
-        )
-        missing_classification_result = await db.execute(missing_classification_query)
-        missing_classification = missing_classification_result.scalar() or 0
-        
-        # Records with low confidence (need reprocessing)
-        low_confidence_query = select(func.count()).where(
-            and_(
-                ExceptionRecord.tenant == tenant,
+    cached = _backlog_cache.get(tenant)
+    if cached is not None and time.monotonic() - cached[0] < BACKLOG_CACHE_TTL_SECONDS:
+        _backlog_cache_stats["hits"] += 1
+        logger.info("Enrichment backlog analysis reused from cache", extra={
+            "tenant": tenant,
+            "cache_hits": _backlog_cache_stats["hits"],
+            "cache_misses": _backlog_cache_stats["misses"]
+        })
+        return cached[1]
+    _backlog_cache_stats["misses"] += 1
+    
+    now = datetime.utcnow()
+    
+    async with _enrichment_session() as db:
+        # Missing-classification, low-confidence (need reprocessing) and
+        # last-24h counts as scalar subqueries, each free to use its own index
+        recent_cutoff = now - timedelta(hours=24)
+        columns = [
+            _tenant_count(tenant, ExceptionRecord.ai_confidence.is_(None)).label("missing"),
+            _tenant_count(
+                tenant,
                 ExceptionRecord.ai_confidence < 0.7,
                 ExceptionRecord.ai_confidence.isnot(None)
-            )
-        )
-        low_confidence_result = await db.execute(low_confidence_query)
-        low_confidence = low_confidence_result.scalar() or 0
+            ).label("low_confidence"),
+            # Confident but unlabelled rows, which the pipeline also picks up;
+            # disjoint from the two counts above so the sum counts each once
+            _tenant_count(
+                tenant,
+                ExceptionRecord.ai_label.is_(None),
+                ExceptionRecord.ai_confidence >= 0.7
+            ).label("missing_label"),
+            _tenant_count(tenant, ExceptionRecord.created_at >= recent_cutoff).label("recent"),
+            _EXCEPTIONS_ROW_ESTIMATE.label("table_estimate"),
+        ]
         
-        # Records created in last 24 hours (recent)
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        recent_query = select(func.count()).where(
-            and_(
-                ExceptionRecord.tenant == tenant,
-                ExceptionRecord.created_at >= recent_cutoff
-            )
+        # The total only feeds the completion rate, so on large tables scale
+        # the planner's row estimate by the tenant's cached share instead of
+        # counting every row
+        share = _tenant_share_cache.get(tenant)
+        use_estimate = share is not None and time.monotonic() - share[0] < TENANT_SHARE_TTL_SECONDS
+        if not use_estimate:
+            columns.append(_tenant_count(tenant).label("total"))
+        
+        # Priority is bucketed in SQL over the counts, which are computed once
+        # in a derived table
+        counts = select(*columns).subquery()
+        needing = counts.c.missing + counts.c.low_confidence + counts.c.missing_label
+        priority_case = case(
+            *((needing > threshold, label) for threshold, label in BACKLOG_PRIORITY_THRESHOLDS),
+            else_="LOW"
         )
-        recent_result = await db.execute(recent_query)
-        recent_records = recent_result.scalar() or 0
         
-        # Calculate priorities
-        total_needing_enrichment = missing_classification + low_confidence
-        enrichment_rate = ((total_records - total_needing_enrichment) / total_records * 100) if total_records > 0 else 100
+        row = (await db.execute(select(counts, priority_case.label("priority")))).one()
+        missing_classification = row.missing
+        low_confidence = row.low_confidence
+        missing_label = row.missing_label
+        recent_records = row.recent
+        priority = row.priority
+        table_estimate = row.table_estimate or 0
+        total_needing_enrichment = missing_classification + low_confidence + missing_label
         
-        # Determine priority level
-        if total_needing_enrichment > 1000:
-            priority = "CRITICAL"
-        elif total_needing_enrichment > 500:
-            priority = "HIGH"
-        elif total_needing_enrichment > 100:
-            priority = "MEDIUM"
+        if use_estimate and table_estimate >= EXACT_TOTAL_MAX_ROWS:
+            total_records = max(int(table_estimate * share[1]), total_needing_enrichment)
         else:
-            priority = "LOW"
+            if use_estimate:
+                # Table shrank below the threshold; count exactly
+                total_records = (await db.execute(select(_tenant_count(tenant)))).scalar_one()
+            else:
+                total_records = row.total
+            if table_estimate >= EXACT_TOTAL_MAX_ROWS:
+                _tenant_share_cache[tenant] = (time.monotonic(), total_records / table_estimate)
+            else:
+                _tenant_share_cache.pop(tenant, None)
+        
+        # Completion percentage in hundredths, kept integral until output
+        enrichment_rate_x100 = (
+            (total_records - total_needing_enrichment) * 10000 // total_records
+        ) if total_records > 0 else 10000
         
         backlog_analysis = {
             "tenant": tenant,
-            "analysis_time": datetime.utcnow().isoformat(),
+            "analysis_time": now.isoformat(),
             "total_records": total_records,
+            "total_records_estimated": use_estimate and table_estimate >= EXACT_TOTAL_MAX_ROWS,
             "missing_classification": missing_classification,
             "low_confidence": low_confidence,
+            "missing_label": missing_label,
             "recent_records": recent_records,
             "total_needing_enrichment": total_needing_enrichment,
-            "enrichment_rate": round(enrichment_rate, 2),
+            "enrichment_rate": enrichment_rate_x100 / 100,
             "priority": priority,
             "recommended_batch_size": min(100, max(10, total_needing_enrichment // 10))
         }
         
-        logger.info(f"Backlog analysis complete: {total_needing_enrichment} records need enrichment "
-                   f"({enrichment_rate:.1f}% completion rate)")
+        _backlog_cache[tenant] = (time.monotonic(), backlog_analysis)
+        
+        logger.info("Enrichment backlog analyzed", extra={
+            "tenant": tenant,
+            "total_needing_enrichment": total_needing_enrichment,
+            "enrichment_rate": backlog_analysis["enrichment_rate"],
+            "priority": priority
+        })
         
         return backlog_analysis
 
@@ -129,7 +257,6 @@ async def execute_enrichment_pipeline(
         Dict[str, Any]: Pipeline execution results
     """
     logger = get_run_logger()
-    logger.info(f"Executing enrichment pipeline for tenant {tenant}")
     
     # Get recommended batch size from backlog analysis
     batch_size = backlog_analysis.get("recommended_batch_size", 50)
@@ -141,30 +268,63 @@ async def execute_enrichment_pipeline(
     elif priority == "LOW":
         batch_size = max(10, batch_size // 2)  # Smaller batches for low priority
     
-    logger.info(f"Using batch size {batch_size} for priority {priority}")
-    
     # Execute the enrichment pipeline
     pipeline = get_enrichment_pipeline()
     
     try:
-        results = await pipeline.process_enrichment_pipeline(
-            tenant=tenant,
-            batch_size=batch_size,
-            max_retries=3
-        )
+        async with _enrichment_session() as db:
+            results = await pipeline.process_enrichment_pipeline(
+                tenant=tenant,
+                batch_size=batch_size,
+                max_retries=3,
+                db=db
+            )
         
-        logger.info(f"Enrichment pipeline completed: {results['records_completed']} completed, "
-                   f"{results['records_failed']} failed")
+        logger.info("Enrichment pipeline completed", extra={
+            "tenant": tenant,
+            "batch_size": batch_size,
+            "priority": priority,
+            "records_completed": results["records_completed"],
+            "records_failed": results["records_failed"]
+        })
         
         return results
         
     except Exception as e:
-        logger.error(f"Enrichment pipeline failed: {e}")
+        logger.error("Enrichment pipeline failed", extra={
+            "tenant": tenant,
+            "batch_size": batch_size,
+            "priority": priority,
+            "error": str(e)
+        })
         raise
 
 
 @task
-async def validate_enrichment_quality(
+async def assess_enrichment_results(
+    pipeline_results: Dict[str, Any],
+    tenant: str = "demo-3pl"
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Validate enrichment quality and raise alerts in a single task.
+    
+    Both steps are pure in-memory transforms, so they run inline under one
+    Prefect task rather than paying task orchestration overhead twice.
+    
+    Args:
+        pipeline_results (Dict[str, Any]): Output from execute_enrichment_pipeline
+        tenant (str): Tenant identifier
+        
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: Quality results and alert summary
+    """
+    quality_results = validate_enrichment_quality(pipeline_results, tenant)
+    alert_summary = generate_enrichment_alerts(quality_results, tenant)
+    
+    return quality_results, alert_summary
+
+
+def validate_enrichment_quality(
     pipeline_results: Dict[str, Any],
     tenant: str = "demo-3pl"
 ) -> Dict[str, Any]:
@@ -182,17 +342,19 @@ async def validate_enrichment_quality(
         Dict[str, Any]: Quality validation results
     """
     logger = get_run_logger()
-    logger.info(f"Validating enrichment quality for tenant {tenant}")
     
-    completeness_report = pipeline_results.get("completeness_report", {})
+    # Read every pipeline input once up front
+    completeness_report = pipeline_results.get("completeness_report") or {}
+    classification_rate = completeness_report.get("classification_rate", 0.0)
+    high_confidence_rate = completeness_report.get("high_confidence_rate", 0.0)
+    error_count = len(pipeline_results.get("errors") or ())
+    records_processed = pipeline_results.get("records_processed", 0)
+    records_completed = pipeline_results.get("records_completed", 0)
     
     # Quality thresholds
     EXCELLENT_THRESHOLD = 90.0
     GOOD_THRESHOLD = 75.0
     
-    classification_rate = completeness_report.get("classification_rate", 0.0)
-    high_confidence_rate = completeness_report.get("high_confidence_rate", 0.0)
-    
     # Determine overall quality
     if high_confidence_rate >= EXCELLENT_THRESHOLD:
         overall_quality = "EXCELLENT"
@@ -216,14 +378,11 @@ async def validate_enrichment_quality(
         issues.append(f"High confidence rate is {high_confidence_rate:.1f}% (target: {GOOD_THRESHOLD}%+)")
         recommendations.append("Review AI model performance and prompt engineering")
     
-    errors = pipeline_results.get("errors", [])
-    if len(errors) > 10:
-        issues.append(f"High error count: {len(errors)} errors during processing")
+    if error_count > 10:
+        issues.append(f"High error count: {error_count} errors during processing")
         recommendations.append("Investigate common error patterns and improve error handling")
     
     # Success metrics
-    records_processed = pipeline_results.get("records_processed", 0)
-    records_completed = pipeline_results.get("records_completed", 0)
     success_rate = (records_completed / records_processed * 100) if records_processed > 0 else 0
     
     validation_results = {
@@ -241,14 +400,18 @@ async def validate_enrichment_quality(
         "completeness_report": completeness_report
     }
     
-    logger.info(f"Quality validation complete: {overall_quality} quality "
-               f"({quality_score:.1f} score, {success_rate:.1f}% success rate)")
+    logger.info("Enrichment quality validated", extra={
+        "tenant": tenant,
+        "overall_quality": overall_quality,
+        "quality_score": validation_results["quality_score"],
+        "success_rate": validation_results["success_rate"],
+        "issue_count": len(issues)
+    })
     
     return validation_results
 
 
-@task
-async def generate_enrichment_alerts(
+def generate_enrichment_alerts(
     quality_results: Dict[str, Any],
     tenant: str = "demo-3pl"
 ) -> Dict[str, Any]:
@@ -266,47 +429,41 @@ async def generate_enrichment_alerts(
         Dict[str, Any]: Generated alerts and notifications
     """
     logger = get_run_logger()
-    logger.info(f"Generating enrichment alerts for tenant {tenant}")
     
     alerts = []
     notifications = []
+    critical_alerts = 0
     
     overall_quality = quality_results.get("overall_quality", "UNKNOWN")
     quality_score = quality_results.get("quality_score", 0.0)
     success_rate = quality_results.get("success_rate", 0.0)
-    issues = quality_results.get("issues", [])
+    issue_count = len(quality_results.get("issues", []))
     
     # Critical alerts
     if overall_quality == "NEEDS_IMPROVEMENT":
         alerts.append({
-            "level": "CRITICAL",
-            "title": "Data Enrichment Quality Below Threshold",
-            "message": f"Enrichment quality is {overall_quality} with {quality_score:.1f}% score",
-            "action_required": "Immediate investigation of AI service performance required"
+            **_QUALITY_BELOW_THRESHOLD_ALERT,
+            "message": f"Enrichment quality is {overall_quality} with {quality_score:.1f}% score"
         })
+        critical_alerts += 1
     
     if success_rate < 80.0:
         alerts.append({
-            "level": "HIGH",
-            "title": "Low Enrichment Success Rate",
-            "message": f"Only {success_rate:.1f}% of records processed successfully",
-            "action_required": "Review error patterns and improve pipeline reliability"
+            **_LOW_SUCCESS_RATE_ALERT,
+            "message": f"Only {success_rate:.1f}% of records processed successfully"
         })
     
     # Warning alerts
-    if len(issues) > 5:
+    if issue_count > 5:
         alerts.append({
-            "level": "WARNING",
-            "title": "Multiple Enrichment Issues Detected",
-            "message": f"{len(issues)} issues found during quality validation",
-            "action_required": "Review and address identified issues"
+            **_MULTIPLE_ISSUES_ALERT,
+            "message": f"{issue_count} issues found during quality validation"
         })
     
     # Success notifications
     if overall_quality == "EXCELLENT" and success_rate > 95.0:
         notifications.append({
-            "level": "SUCCESS",
-            "title": "Excellent Enrichment Quality",
+            **_EXCELLENT_QUALITY_NOTIFICATION,
             "message": f"Achieved {overall_quality} quality with {success_rate:.1f}% success rate"
         })
     
@@ -316,14 +473,17 @@ async def generate_enrichment_alerts(
         "alerts": alerts,
         "notifications": notifications,
         "total_alerts": len(alerts),
-        "critical_alerts": len([a for a in alerts if a["level"] == "CRITICAL"]),
+        "critical_alerts": critical_alerts,
         "requires_attention": len(alerts) > 0
     }
     
-    if alerts:
-        logger.warning(f"Generated {len(alerts)} enrichment alerts for tenant {tenant}")
-    else:
-        logger.info(f"No enrichment alerts required for tenant {tenant}")
+    log_alerts = logger.warning if alerts else logger.info
+    log_alerts("Enrichment alerts generated", extra={
+        "tenant": tenant,
+        "total_alerts": len(alerts),
+        "critical_alerts": critical_alerts,
+        "notifications": len(notifications)
+    })
     
     return alert_summary
 
@@ -341,6 +501,10 @@ async def data_enrichment_flow(
     Orchestrates systematic AI enrichment of all data records with
     automatic reprocessing, quality validation, and alerting.
     
+    When the backlog analysis finds nothing needing enrichment and
+    force_reprocessing is off, the pipeline, validation and alert steps are
+    skipped and zeroed results are returned with SUCCESS status.
+    
     Args:
         tenant (str): Tenant to process
         force_reprocessing (bool): Force reprocessing of all records
@@ -351,17 +515,54 @@ async def data_enrichment_flow(
     logger = get_run_logger()
     logger.info(f"Starting data enrichment flow for tenant {tenant}")
     
-    # Step 1: Analyze enrichment backlog
-    backlog_analysis = await analyze_enrichment_backlog(tenant)
-    
-    # Step 2: Execute enrichment pipeline
-    pipeline_results = await execute_enrichment_pipeline(backlog_analysis, tenant)
-    
-    # Step 3: Validate enrichment quality
-    quality_results = await validate_enrichment_quality(pipeline_results, tenant)
+    # One session (and pooled connection) for the backlog analysis and the
+    # pipeline; tasks pick it up through _flow_session
+    async with get_session() as db:
+        token = _flow_session.set(db)
+        try:
+            # Step 1: Analyze enrichment backlog
+            backlog_analysis = await analyze_enrichment_backlog(tenant)
+            
+            # Fast path: nothing to enrich, so skip all downstream steps
+            if backlog_analysis["total_needing_enrichment"] == 0 and not force_reprocessing:
+                logger.info(f"No enrichment backlog for tenant {tenant}; skipping pipeline")
+                return {
+                    "tenant": tenant,
+                    "execution_time": datetime.utcnow().isoformat(),
+                    "force_reprocessing": force_reprocessing,
+                    "backlog_analysis": backlog_analysis,
+                    "pipeline_results": {
+                        "tenant": tenant,
+                        "records_processed": 0,
+                        "records_completed": 0,
+                        "records_failed": 0,
+                        "errors": []
+                    },
+                    "quality_results": {
+                        "tenant": tenant,
+                        "overall_quality": "NOT_EVALUATED",
+                        "quality_score": None,
+                        "issues": [],
+                        "recommendations": []
+                    },
+                    "alert_summary": {
+                        "tenant": tenant,
+                        "alerts": [],
+                        "notifications": [],
+                        "total_alerts": 0,
+                        "critical_alerts": 0,
+                        "requires_attention": False
+                    },
+                    "flow_status": "SUCCESS"
+                }
+            
+            # Step 2: Execute enrichment pipeline
+            pipeline_results = await execute_enrichment_pipeline(backlog_analysis, tenant)
+        finally:
+            _flow_session.reset(token)
     
-    # Step 4: Generate alerts if needed
-    alert_summary = await generate_enrichment_alerts(quality_results, tenant)
+    # Steps 3-4: Validate enrichment quality and generate alerts if needed
+    quality_results, alert_summary = await assess_enrichment_results(pipeline_results, tenant)
     
     # Compile comprehensive results
     flow_results = {
@@ -409,37 +610,60 @@ async def scheduled_enrichment_maintenance() -> Dict[str, Any]:
         "overall_status": "SUCCESS"
     }
     
-    for tenant in tenants:
-        try:
+    # At most MAX_CONCURRENT_TENANTS sub-flows hold a session at once, so the
+    # next tenant's backlog analysis overlaps the current tenant's pipeline
+    # without every tenant hitting the database together
+    tenant_slots = asyncio.Semaphore(MAX_CONCURRENT_TENANTS)
+    
+    async def _run_tenant(tenant: str) -> Dict[str, Any]:
+        async with tenant_slots:
             logger.info(f"Processing enrichment maintenance for tenant {tenant}")
-            
-            tenant_results = await data_enrichment_flow(tenant)
-            
-            maintenance_results["tenants_processed"].append({
-                "tenant": tenant,
-                "status": tenant_results["flow_status"],
-                "records_processed": tenant_results["pipeline_results"]["records_processed"],
-                "records_completed": tenant_results["pipeline_results"]["records_completed"],
-                "quality_score": tenant_results["quality_results"]["quality_score"]
-            })
-            
-            # Aggregate statistics
-            maintenance_results["total_records_processed"] += tenant_results["pipeline_results"]["records_processed"]
-            maintenance_results["total_records_completed"] += tenant_results["pipeline_results"]["records_completed"]
-            maintenance_results["critical_alerts"] += tenant_results["alert_summary"]["critical_alerts"]
-            
-            # Update overall status
-            if tenant_results["flow_status"] == "WARNING":
-                maintenance_results["overall_status"] = "WARNING"
-            
-        except Exception as e:
-            logger.error(f"Enrichment maintenance failed for tenant {tenant}: {e}")
-            maintenance_results["tenants_processed"].append({
+            return await data_enrichment_flow(tenant)
+    
+    # Tenant sub-flows are independent and I/O-bound, so run them concurrently;
+    # failures come back as exceptions and are recorded per tenant below
+    outcomes = await asyncio.gather(
+        *(_run_tenant(tenant) for tenant in tenants),
+        return_exceptions=True
+    )
+    
+    tenants_processed = maintenance_results["tenants_processed"]
+    total_records_processed = total_records_completed = critical_alerts = 0
+    
+    for tenant, tenant_results in zip(tenants, outcomes):
+        if isinstance(tenant_results, Exception):
+            logger.error(f"Enrichment maintenance failed for tenant {tenant}: {tenant_results}")
+            tenants_processed.append({
                 "tenant": tenant,
                 "status": "FAILED",
-                "error": str(e)
+                "error": str(tenant_results)
             })
             maintenance_results["overall_status"] = "FAILED"
+            continue
+        
+        flow_status = tenant_results["flow_status"]
+        records_processed, records_completed = _pipeline_record_counts(tenant_results["pipeline_results"])
+        
+        tenants_processed.append({
+            "tenant": tenant,
+            "status": flow_status,
+            "records_processed": records_processed,
+            "records_completed": records_completed,
+            "quality_score": tenant_results["quality_results"]["quality_score"]
+        })
+        
+        # Aggregate statistics
+        total_records_processed += records_processed
+        total_records_completed += records_completed
+        critical_alerts += tenant_results["alert_summary"]["critical_alerts"]
+        
+        # Update overall status; a failure elsewhere takes precedence
+        if flow_status == "WARNING" and maintenance_results["overall_status"] != "FAILED":
+            maintenance_results["overall_status"] = "WARNING"
+    
+    maintenance_results["total_records_processed"] = total_records_processed
+    maintenance_results["total_records_completed"] = total_records_completed
+    maintenance_results["critical_alerts"] = critical_alerts
     
     logger.info(f"Scheduled enrichment maintenance completed: {maintenance_results['overall_status']} status")
     
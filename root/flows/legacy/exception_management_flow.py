@@ -16,8 +16,9 @@ rather than just passive monitoring.
 """
 
 import asyncio
+import heapq
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from prefect import flow, task, get_run_logger
 from sqlalchemy import select, and_, func, desc
@@ -31,6 +32,138 @@ from app.services.ai_automated_resolution import (
 )
 
 
+# ==== CONSTANTS ==== #
+
+# Pattern analysis scans the lookback window in day-sized slices
+PATTERN_SCAN_WINDOW = timedelta(hours=24)
+PATTERN_SCAN_BATCH_SIZE = 500
+
+# Max order IDs kept per reason code in the pattern-analysis payload
+IMPACT_ORDER_SAMPLE_SIZE = 20
+
+
+def _iter_time_windows(
+    start: datetime,
+    end: datetime,
+    step: timedelta
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Split [start, end) into consecutive half-open windows of at most `step`.
+    
+    Args:
+        start: Inclusive window start
+        end: Exclusive window end
+        step: Maximum window length
+        
+    Yields:
+        Tuple[datetime, datetime]: (window_start, window_end) pairs
+    """
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + step, end)
+        yield window_start, window_end
+        window_start = window_end
+
+
+# Columns needed for pattern analysis, fetched as plain rows
+_PATTERN_COLUMNS = (
+    ExceptionRecord.reason_code,
+    ExceptionRecord.order_id,
+    ExceptionRecord.status,
+    ExceptionRecord.severity,
+    ExceptionRecord.created_at,
+    ExceptionRecord.resolved_at,
+)
+
+
+def _new_pattern_state() -> Dict[str, Any]:
+    """Create an empty accumulator for _fold_exception_rows."""
+    return {
+        'patterns': {
+            'by_reason_code': {},
+            'by_severity': {},
+            'by_hour_of_day': {},
+            'by_day_of_week': {},
+            'resolution_trends': {},
+            'customer_impact': {}
+        },
+        # Distinct impacted orders per reason code (kept out of the task payload)
+        'impacted_orders': {},
+        'total': 0,
+        'resolved': 0,
+        'critical': 0,
+        # Running (key, count) maxima, updated as counts grow
+        'peak_hour': (None, 0),
+        'peak_day': (None, 0)
+    }
+
+
+def _fold_exception_rows(state: Dict[str, Any], rows: List[Tuple]) -> None:
+    """
+    Fold a batch of exception rows into the pattern accumulator.
+    
+    Pure CPU work, safe to run via asyncio.to_thread as long as batches
+    for the same state are folded one at a time.
+    
+    Args:
+        state: Accumulator from _new_pattern_state
+        rows: (reason_code, order_id, status, severity, created_at, resolved_at) rows
+    """
+    patterns = state['patterns']
+    by_reason_code = patterns['by_reason_code']
+    by_severity = patterns['by_severity']
+    by_hour_of_day = patterns['by_hour_of_day']
+    by_day_of_week = patterns['by_day_of_week']
+    impacted_orders = state['impacted_orders']
+    
+    for reason, order_id, status, severity, created_at, resolved_at in rows:
+        state['total'] += 1
+        
+        if reason not in by_reason_code:
+            by_reason_code[reason] = {
+                'count': 0,
+                'avg_resolution_hours': 0,
+                'order_ids_sample': [],
+                'unique_order_count': 0
+            }
+            impacted_orders[reason] = set()
+        
+        reason_stats = by_reason_code[reason]
+        reason_stats['count'] += 1
+        
+        # Track a bounded sample plus a distinct count instead of every order ID
+        reason_orders = impacted_orders[reason]
+        if order_id not in reason_orders:
+            reason_orders.add(order_id)
+            if len(reason_stats['order_ids_sample']) < IMPACT_ORDER_SAMPLE_SIZE:
+                reason_stats['order_ids_sample'].append(order_id)
+        
+        # Calculate resolution time if resolved
+        if status == 'RESOLVED' and resolved_at:
+            resolution_hours = (resolved_at - created_at).total_seconds() / 3600
+            current_avg = reason_stats['avg_resolution_hours']
+            current_count = reason_stats['count']
+            reason_stats['avg_resolution_hours'] = (
+                (current_avg * (current_count - 1) + resolution_hours) / current_count
+            )
+        
+        by_severity[severity] = by_severity.get(severity, 0) + 1
+        
+        hour = created_at.hour
+        day_of_week = created_at.strftime('%A')
+        hour_count = by_hour_of_day[hour] = by_hour_of_day.get(hour, 0) + 1
+        day_count = by_day_of_week[day_of_week] = by_day_of_week.get(day_of_week, 0) + 1
+        
+        if hour_count > state['peak_hour'][1]:
+            state['peak_hour'] = (hour, hour_count)
+        if day_count > state['peak_day'][1]:
+            state['peak_day'] = (day_of_week, day_count)
+        
+        # Overall metrics (booleans add as 0/1)
+        state['resolved'] += status == 'RESOLVED'
+        state['critical'] += severity == 'CRITICAL'
+
+
 # ==== EXCEPTION ANALYSIS TASKS ==== #
 
 
@@ -58,103 +191,69 @@ async def analyze_exception_patterns(
     logger = get_run_logger()
     logger.info(f"Analyzing exception patterns for tenant {tenant}")
     
+    state = _new_pattern_state()
+    
     async with get_session() as db:
-        cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+        now = datetime.utcnow()
+        cutoff_time = now - timedelta(hours=lookback_hours)
         
-        # Get exceptions for analysis
-        query = select(ExceptionRecord).where(
-            and_(
-                ExceptionRecord.tenant == tenant,
-                ExceptionRecord.created_at >= cutoff_time
-            )
-        ).order_by(desc(ExceptionRecord.created_at))
-        
-        result = await db.execute(query)
-        exceptions = result.scalars().all()
-        
-        if not exceptions:
-            return {
-                'tenant': tenant,
-                'analysis_period_hours': lookback_hours,
-                'total_exceptions': 0,
-                'patterns': {}
-            }
-        
-        # Analyze patterns
-        patterns = {
-            'by_reason_code': {},
-            'by_severity': {},
-            'by_hour_of_day': {},
-            'by_day_of_week': {},
-            'resolution_trends': {},
-            'customer_impact': {}
-        }
-        
-        # Group by reason code
-        for exc in exceptions:
-            reason = exc.reason_code
-            if reason not in patterns['by_reason_code']:
-                patterns['by_reason_code'][reason] = {
-                    'count': 0,
-                    'avg_resolution_hours': 0,
-                    'customer_impact_orders': []
-                }
-            
-            patterns['by_reason_code'][reason]['count'] += 1
-            patterns['by_reason_code'][reason]['customer_impact_orders'].append(exc.order_id)
-            
-            # Calculate resolution time if resolved
-            if exc.status == 'RESOLVED' and exc.resolved_at:
-                resolution_hours = (exc.resolved_at - exc.created_at).total_seconds() / 3600
-                current_avg = patterns['by_reason_code'][reason]['avg_resolution_hours']
-                current_count = patterns['by_reason_code'][reason]['count']
-                patterns['by_reason_code'][reason]['avg_resolution_hours'] = (
-                    (current_avg * (current_count - 1) + resolution_hours) / current_count
+        # Scan one day at a time so memory stays O(rows-per-day) on long windows
+        for window_start, window_end in _iter_time_windows(cutoff_time, now, PATTERN_SCAN_WINDOW):
+            query = select(*_PATTERN_COLUMNS).where(
+                and_(
+                    ExceptionRecord.tenant == tenant,
+                    ExceptionRecord.created_at >= window_start,
+                    ExceptionRecord.created_at < window_end
                 )
-        
-        # Group by severity
-        for exc in exceptions:
-            severity = exc.severity
-            patterns['by_severity'][severity] = patterns['by_severity'].get(severity, 0) + 1
-        
-        # Group by time patterns
-        for exc in exceptions:
-            hour = exc.created_at.hour
-            day_of_week = exc.created_at.strftime('%A')
+            ).execution_options(yield_per=PATTERN_SCAN_BATCH_SIZE)
             
-            patterns['by_hour_of_day'][hour] = patterns['by_hour_of_day'].get(hour, 0) + 1
-            patterns['by_day_of_week'][day_of_week] = patterns['by_day_of_week'].get(day_of_week, 0) + 1
-        
-        # Identify top issues
-        top_issues = sorted(
-            patterns['by_reason_code'].items(),
-            key=lambda x: x[1]['count'],
-            reverse=True
-        )[:5]
-        
-        # Calculate overall metrics
-        total_exceptions = len(exceptions)
-        resolved_exceptions = len([e for e in exceptions if e.status == 'RESOLVED'])
-        critical_exceptions = len([e for e in exceptions if e.severity == 'CRITICAL'])
-        
-        logger.info(f"Pattern analysis complete: {total_exceptions} exceptions analyzed, "
-                   f"top issue: {top_issues[0][0] if top_issues else 'None'}")
-        
+            result = await db.stream(query)
+            
+            # Fold each partition off the event loop; the DB fetch stays async
+            async for rows in result.partitions():
+                await asyncio.to_thread(_fold_exception_rows, state, rows)
+    
+    patterns = state['patterns']
+    total_exceptions = state['total']
+    resolved_exceptions = state['resolved']
+    critical_exceptions = state['critical']
+    
+    if not total_exceptions:
         return {
             'tenant': tenant,
             'analysis_period_hours': lookback_hours,
-            'total_exceptions': total_exceptions,
-            'resolved_exceptions': resolved_exceptions,
-            'critical_exceptions': critical_exceptions,
-            'resolution_rate': resolved_exceptions / total_exceptions if total_exceptions > 0 else 0,
-            'patterns': patterns,
-            'top_issues': top_issues,
-            'insights': {
-                'peak_hour': max(patterns['by_hour_of_day'].items(), key=lambda x: x[1])[0] if patterns['by_hour_of_day'] else None,
-                'peak_day': max(patterns['by_day_of_week'].items(), key=lambda x: x[1])[0] if patterns['by_day_of_week'] else None,
-                'most_common_issue': top_issues[0][0] if top_issues else None
-            }
+            'total_exceptions': 0,
+            'patterns': {}
+        }
+    
+    for reason, reason_orders in state['impacted_orders'].items():
+        patterns['by_reason_code'][reason]['unique_order_count'] = len(reason_orders)
+    
+    # Identify top issues
+    top_issues = heapq.nlargest(
+        5,
+        patterns['by_reason_code'].items(),
+        key=lambda x: x[1]['count']
+    )
+    
+    logger.info(f"Pattern analysis complete: {total_exceptions} exceptions analyzed, "
+               f"top issue: {top_issues[0][0] if top_issues else 'None'}")
+    
+    return {
+        'tenant': tenant,
+        'analysis_period_hours': lookback_hours,
+        'total_exceptions': total_exceptions,
+        'resolved_exceptions': resolved_exceptions,
+        'critical_exceptions': critical_exceptions,
+        'resolution_rate': resolved_exceptions / total_exceptions if total_exceptions > 0 else 0,
+        'patterns': patterns,
+        'top_issues': top_issues,
+        'insights': {
+            'peak_hour': state['peak_hour'][0],
+            'peak_day': state['peak_day'][0],
+            'most_common_issue': top_issues[0][0] if top_issues else None
         }
+    }
 
 
 @task
@@ -370,19 +469,25 @@ async def attempt_automated_resolution(
     ai_analyses_performed = 0
     
     async with get_session() as db:
+        # Reload all candidates in this session in one query, row-locking them so
+        # concurrent pipeline runs claim disjoint slices instead of double-resolving
+        exception_ids = [exc_data['exception'].id for exc_data in all_exceptions]
+        claim_query = select(ExceptionRecord).where(
+            ExceptionRecord.id.in_(exception_ids)
+        ).with_for_update(skip_locked=True)
+        result = await db.execute(claim_query)
+        claimed_exceptions = {exc.id: exc for exc in result.scalars().all()}
+        
         for exc_data in all_exceptions:
             exc_id = exc_data['exception'].id
             reason_code = exc_data['exception'].reason_code
             order_id = exc_data['exception'].order_id
             current_attempts = exc_data.get('resolution_attempts', 0)
             
-            # Reload the exception in this session to avoid detached object issues
-            exc_query = select(ExceptionRecord).where(ExceptionRecord.id == exc_id)
-            result = await db.execute(exc_query)
-            exc = result.scalar_one_or_none()
+            exc = claimed_exceptions.get(exc_id)
             
             if not exc:
-                logger.warning(f"Exception {exc_id} not found, skipping")
+                logger.info(f"Exception {exc_id} not found or locked by another run, skipping")
                 continue
             
             # Skip if already resolved or blocked
@@ -581,8 +686,8 @@ async def generate_exception_insights(
         patterns = pattern_analysis['patterns']
         
         # Key findings from patterns
-        if patterns.get('by_reason_code'):
-            top_issue = max(patterns['by_reason_code'].items(), key=lambda x: x[1]['count'])
+        if pattern_analysis.get('top_issues'):
+            top_issue = pattern_analysis['top_issues'][0]
             insights['key_findings'].append(
                 f"Most common issue: {top_issue[0]} ({top_issue[1]['count']} occurrences)"
             )
@@ -16,12 +16,13 @@ sends order events that trigger processing workflows.
 """
 
 import asyncio
+import random
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
 from prefect import flow, task, get_run_logger
 from prefect.deployments import run_deployment
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, exists, func, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import sys
@@ -29,10 +30,71 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.storage.db import get_session
-from app.storage.models import OrderEvent, ExceptionRecord, Invoice, InvoiceAdjustment
-from app.services.invoice_generator import InvoiceGeneratorService
+from app.storage.dao import list_order_events
+from app.storage.models import (
+    OrderEvent, OrderStatusSummary, ExceptionRecord, Invoice, InvoiceAdjustment
+)
+from app.services.invoice_queue import enqueue_many, drain_invoice_queue
 from app.services.billing import BillingService
-from app.services.processing_stage_service import ProcessingStageService, DataCompletenessService
+from app.services.processing_stage_service import ProcessingStageService
+
+
+# Order events counted by monitor_order_fulfillment; must match the
+# order_status_summary trigger from migration 010
+MONITORED_ORDER_EVENT_TYPES = ('order_created', 'order_updated')
+
+# Orders still in these statuses this many hours after creation are stalled
+STALLED_ORDER_STATUSES = ('pending', 'processing')
+STALLED_ORDER_HOURS = 4
+
+# Per-stage (success rate, stage data builder) used by _simulate_stage_processing
+STAGE_SIMULATIONS: Dict[str, Tuple[float, Callable[[], Dict[str, Any]]]] = {
+    "data_ingestion": (0.95, lambda: {
+        'records_ingested': random.randint(50, 200),
+        'source_files': random.randint(1, 5),
+        'ingestion_method': 'batch_api'
+    }),
+    "data_validation": (0.90, lambda: {
+        'validation_rules_checked': random.randint(15, 30),
+        'validation_errors': random.randint(0, 3),
+        'data_quality_score': random.uniform(0.85, 1.0)
+    }),
+    "data_transformation": (0.92, lambda: {
+        'transformation_rules_applied': random.randint(8, 15),
+        'records_transformed': random.randint(50, 200),
+        'output_format': 'normalized_json'
+    }),
+    "business_rules": (0.88, lambda: {
+        'business_rules_evaluated': random.randint(5, 12),
+        'compliance_score': random.uniform(0.80, 1.0),
+        'exceptions_flagged': random.randint(0, 2)
+    }),
+    "ai_processing": (0.85, lambda: {
+        'ai_model_version': 'v2.1.0',
+        'confidence_score': random.uniform(0.70, 0.95),
+        'predictions_generated': random.randint(3, 8)
+    }),
+    "output_generation": (0.93, lambda: {
+        'output_formats': ['json', 'csv'],
+        'files_generated': random.randint(1, 3),
+        'file_size_bytes': random.randint(1024, 8192)
+    }),
+    "delivery": (0.90, lambda: {
+        'delivery_method': 'webhook',
+        'delivery_attempts': 1,
+        'response_time_ms': random.randint(100, 500)
+    }),
+}
+
+# Simulated per-stage processing time; set SIMULATE_STAGE_LATENCY (seconds),
+# e.g. 0.1, to reproduce realistic stage timing
+SIMULATED_STAGE_LATENCY_SECONDS = float(os.getenv("SIMULATE_STAGE_LATENCY", "0"))
+
+# Processing stages run at once by manage_processing_stages
+STAGE_PROCESSING_CONCURRENCY = 8
+
+# Invoice generations in flight at once in the invoice worker
+INVOICE_GENERATION_CONCURRENCY = 16
 
 
 # ==== ORDER LIFECYCLE TASKS ==== #
@@ -60,52 +122,78 @@ async def monitor_order_fulfillment(
     logger = get_run_logger()
     logger.info(f"Monitoring order fulfillment for tenant {tenant}")
     
-    cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+    now = datetime.utcnow()
+    cutoff_time = now - timedelta(hours=lookback_hours)
+    stall_cutoff = now - timedelta(hours=STALLED_ORDER_HOURS)
     
-    async with get_session() as db:
-        # Get recent orders
-        result = await db.execute(
-            select(OrderEvent)
-            .filter(
-                and_(
-                    OrderEvent.tenant == tenant,
-                    OrderEvent.created_at >= cutoff_time,
-                    OrderEvent.event_type.in_(['order_created', 'order_updated'])
-                )
-            )
-            .order_by(OrderEvent.created_at.desc())
+    # Whole hours come from the trigger-maintained summary; only the partial
+    # hour at the start of the window is counted from raw events
+    first_full_hour = cutoff_time.replace(minute=0, second=0, microsecond=0)
+    if first_full_hour < cutoff_time:
+        first_full_hour += timedelta(hours=1)
+    
+    status_expr = func.coalesce(OrderEvent.fulfillment_status, 'unknown')
+    window_filter = and_(
+        OrderEvent.tenant == tenant,
+        OrderEvent.created_at >= cutoff_time,
+        OrderEvent.event_type.in_(MONITORED_ORDER_EVENT_TYPES)
+    )
+    
+    summary_counts = select(
+        OrderStatusSummary.fulfillment_status.label('status'),
+        func.sum(OrderStatusSummary.event_count).label('count')
+    ).where(
+        and_(
+            OrderStatusSummary.tenant == tenant,
+            OrderStatusSummary.bucket_start >= first_full_hour
         )
-        
-        orders = result.scalars().all()
-        
-        # Analyze order status
-        order_analysis = {
-            'total_orders': len(orders),
-            'orders_by_status': {},
-            'stalled_orders': [],
-            'processing_delays': []
-        }
-        
-        for order in orders:
-            payload = order.payload
-            status = payload.get('fulfillment_status', 'unknown')
-            
-            # Count by status
-            order_analysis['orders_by_status'][status] = (
-                order_analysis['orders_by_status'].get(status, 0) + 1
-            )
-            
-            # Check for stalled orders (created > 4 hours ago, still pending)
-            if (status in ['pending', 'processing'] and 
-                order.created_at < datetime.utcnow() - timedelta(hours=4)):
-                order_analysis['stalled_orders'].append({
-                    'order_id': order.order_id,
-                    'status': status,
-                    'age_hours': (datetime.utcnow() - order.created_at).total_seconds() / 3600
-                })
-        
-        logger.info(f"Analyzed {len(orders)} orders, found {len(order_analysis['stalled_orders'])} stalled")
-        return order_analysis
+    ).group_by(OrderStatusSummary.fulfillment_status)
+    
+    partial_hour_counts = select(
+        status_expr.label('status'),
+        func.count().label('count')
+    ).where(
+        and_(window_filter, OrderEvent.created_at < first_full_hour)
+    ).group_by(status_expr)
+    
+    stalled_query = select(
+        OrderEvent.order_id,
+        status_expr.label('status'),
+        OrderEvent.created_at
+    ).where(
+        and_(
+            window_filter,
+            OrderEvent.created_at < stall_cutoff,
+            status_expr.in_(STALLED_ORDER_STATUSES)
+        )
+    ).order_by(OrderEvent.created_at.desc())
+    
+    async with get_session() as db:
+        status_rows = (await db.execute(union_all(summary_counts, partial_hour_counts))).all()
+        stalled_rows = (await db.execute(stalled_query)).all()
+    
+    orders_by_status: Dict[str, int] = {}
+    for status, count in status_rows:
+        orders_by_status[status] = orders_by_status.get(status, 0) + int(count)
+    
+    # Stalled orders: created > STALLED_ORDER_HOURS ago, still pending
+    order_analysis = {
+        'total_orders': sum(orders_by_status.values()),
+        'orders_by_status': orders_by_status,
+        'stalled_orders': [
+            {
+                'order_id': row.order_id,
+                'status': row.status,
+                'age_hours': (now - row.created_at).total_seconds() / 3600
+            }
+            for row in stalled_rows
+        ],
+        'processing_delays': []
+    }
+    
+    logger.info(f"Analyzed {order_analysis['total_orders']} orders, "
+               f"found {len(order_analysis['stalled_orders'])} stalled")
+    return order_analysis
 
 
 @task
@@ -130,71 +218,84 @@ async def manage_processing_stages(
     logger.info(f"Managing processing stages for tenant {tenant}")
     
     async with get_session() as db:
-        stage_service = ProcessingStageService(db)
-        completeness_service = DataCompletenessService(db)
-        
         # Get eligible stages
-        eligible_stages = await stage_service.get_eligible_stages(tenant, batch_size)
-        
-        if not eligible_stages:
-            logger.info("No eligible stages found for processing")
-            return {
-                'status': 'no_work',
-                'eligible_stages': 0,
-                'processed_stages': 0,
-                'failed_stages': 0,
-                'success_rate': 0.0
-            }
-        
-        logger.info(f"Found {len(eligible_stages)} eligible stages to process")
-        
-        processed_count = 0
-        failed_count = 0
-        
-        # Process each eligible stage
-        for stage in eligible_stages:
-            try:
-                # Start the stage
-                started_stage = await stage_service.start_stage(
-                    tenant, stage.order_id, stage.stage_name
-                )
-                
-                if started_stage:
-                    # Simulate stage processing based on stage type
-                    success, stage_data, error_msg = await _simulate_stage_processing(
-                        stage.stage_name, stage.order_id
-                    )
-                    
-                    if success:
-                        # Complete the stage
-                        await stage_service.complete_stage(
-                            tenant, stage.order_id, stage.stage_name, stage_data
-                        )
-                        processed_count += 1
-                        logger.info(f"Completed {stage.stage_name} for {stage.order_id}")
-                    else:
-                        # Fail the stage
-                        await stage_service.fail_stage(
-                            tenant, stage.order_id, stage.stage_name, error_msg
-                        )
-                        failed_count += 1
-                        logger.warning(f"Failed {stage.stage_name} for {stage.order_id}: {error_msg}")
-                        
-            except Exception as e:
-                logger.error(f"Error processing stage {stage.stage_name}: {e}")
-                failed_count += 1
-        
-        # Get updated metrics
-        metrics = await stage_service.get_stage_metrics(tenant)
-        
+        eligible_stages = await ProcessingStageService(db).get_eligible_stages(tenant, batch_size)
+    
+    if not eligible_stages:
+        logger.info("No eligible stages found for processing")
         return {
-            'status': 'completed',
-            'eligible_stages': len(eligible_stages),
-            'processed_stages': processed_count,
-            'failed_stages': failed_count,
-            'success_rate': (processed_count / len(eligible_stages) * 100) if eligible_stages else 0,
-            'stage_metrics': metrics
+            'status': 'no_work',
+            'eligible_stages': 0,
+            'processed_stages': 0,
+            'failed_stages': 0,
+            'success_rate': 0.0
         }
+    
+    logger.info(f"Found {len(eligible_stages)} eligible stages to process")
+    
+    # Stages are processed concurrently, each on its own session since an
+    # AsyncSession must not be shared across concurrent awaits
+    stage_slots = asyncio.Semaphore(STAGE_PROCESSING_CONCURRENCY)
+    
+    async def _process_stage(stage: Any) -> Optional[bool]:
+        async with stage_slots, get_session() as stage_db:
+            stage_service = ProcessingStageService(stage_db)
+            
+            # Start the stage
+            started_stage = await stage_service.start_stage(
+                tenant, stage.order_id, stage.stage_name
+            )
+            if not started_stage:
+                return None
+            
+            # Simulate stage processing based on stage type
+            success, stage_data, error_msg = await _simulate_stage_processing(
+                stage.stage_name, stage.order_id
+            )
+            
+            if success:
+                # Complete the stage
+                await stage_service.complete_stage(
+                    tenant, stage.order_id, stage.stage_name, stage_data
+                )
+                logger.info(f"Completed {stage.stage_name} for {stage.order_id}")
+            else:
+                # Fail the stage
+                await stage_service.fail_stage(
+                    tenant, stage.order_id, stage.stage_name, error_msg
+                )
+                logger.warning(f"Failed {stage.stage_name} for {stage.order_id}: {error_msg}")
+            
+            return success
+    
+    outcomes = await asyncio.gather(
+        *(_process_stage(stage) for stage in eligible_stages),
+        return_exceptions=True
+    )
+    
+    processed_count = 0
+    failed_count = 0
+    for stage, outcome in zip(eligible_stages, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error processing stage {stage.stage_name}: {outcome}")
+            failed_count += 1
+        elif outcome is True:
+            processed_count += 1
+        elif outcome is False:
+            failed_count += 1
+    
+    # Get updated metrics
+    async with get_session() as db:
+        metrics = await ProcessingStageService(db).get_stage_metrics(tenant)
+    
+    return {
+        'status': 'completed',
+        'eligible_stages': len(eligible_stages),
+        'processed_stages': processed_count,
+        'failed_stages': failed_count,
+        'success_rate': (processed_count / len(eligible_stages) * 100) if eligible_stages else 0,
+        'stage_metrics': metrics
+    }
 
 
 async def _simulate_stage_processing(stage_name: str, order_id: str) -> tuple[bool, Dict[str, Any], str]:
@@ -203,67 +304,18 @@ async def _simulate_stage_processing(stage_name: str, order_id: str) -> tuple[bo
     
     In a real implementation, this would call actual processing services.
     """
-    import random
-    
-    # Simulate processing time
-    await asyncio.sleep(0.1)
+    # Simulated processing time is opt-in; by default only yield to the loop
+    await asyncio.sleep(SIMULATED_STAGE_LATENCY_SECONDS)
     
     # Stage-specific processing simulation with realistic success rates
-    if stage_name == "data_ingestion":
-        success_rate = 0.95
-        stage_data = {
-            'records_ingested': random.randint(50, 200),
-            'source_files': random.randint(1, 5),
-            'ingestion_method': 'batch_api'
-        }
-    elif stage_name == "data_validation":
-        success_rate = 0.90
-        stage_data = {
-            'validation_rules_checked': random.randint(15, 30),
-            'validation_errors': random.randint(0, 3),
-            'data_quality_score': random.uniform(0.85, 1.0)
-        }
-    elif stage_name == "data_transformation":
-        success_rate = 0.92
-        stage_data = {
-            'transformation_rules_applied': random.randint(8, 15),
-            'records_transformed': random.randint(50, 200),
-            'output_format': 'normalized_json'
-        }
-    elif stage_name == "business_rules":
-        success_rate = 0.88
-        stage_data = {
-            'business_rules_evaluated': random.randint(5, 12),
-            'compliance_score': random.uniform(0.80, 1.0),
-            'exceptions_flagged': random.randint(0, 2)
-        }
-    elif stage_name == "ai_processing":
-        success_rate = 0.85
-        stage_data = {
-            'ai_model_version': 'v2.1.0',
-            'confidence_score': random.uniform(0.70, 0.95),
-            'predictions_generated': random.randint(3, 8)
-        }
-    elif stage_name == "output_generation":
-        success_rate = 0.93
-        stage_data = {
-            'output_formats': ['json', 'csv'],
-            'files_generated': random.randint(1, 3),
-            'file_size_bytes': random.randint(1024, 8192)
-        }
-    elif stage_name == "delivery":
-        success_rate = 0.90
-        stage_data = {
-            'delivery_method': 'webhook',
-            'delivery_attempts': 1,
-            'response_time_ms': random.randint(100, 500)
-        }
-    else:
-        success_rate = 0.85
+    success_rate, build_stage_data = STAGE_SIMULATIONS.get(stage_name, (0.85, None))
+    if build_stage_data is None:
         stage_data = {
             'stage_processed': stage_name,
             'processing_time_ms': random.randint(100, 1000)
         }
+    else:
+        stage_data = build_stage_data()
     
     # Determine success/failure
     success = random.random() < success_rate
@@ -293,47 +345,39 @@ async def detect_sla_breaches(
     logger = get_run_logger()
     logger.info(f"Detecting SLA breaches for tenant {tenant}")
     
-    cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+    now = datetime.utcnow()
+    cutoff_time = now - timedelta(hours=lookback_hours)
+    
+    # SLA: Orders should be fulfilled within 72 hours
+    sla_cutoff = now - timedelta(hours=72)
     
     async with get_session() as db:
-        # Get recent order events
-        result = await db.execute(
-            select(OrderEvent)
-            .filter(
-                and_(
-                    OrderEvent.tenant == tenant,
-                    OrderEvent.created_at >= cutoff_time
-                )
+        # Simple SLA breach detection logic, aggregated in SQL: delivery
+        # delays are order_created events older than the SLA cutoff
+        is_breach = and_(
+            OrderEvent.event_type == 'order_created',
+            OrderEvent.occurred_at < sla_cutoff
+        )
+        query = select(
+            func.count().label('total_events'),
+            func.count().filter(is_breach).label('breaches'),
+            func.count(func.distinct(OrderEvent.order_id)).filter(is_breach).label('orders_affected')
+        ).where(
+            and_(
+                OrderEvent.tenant == tenant,
+                OrderEvent.created_at >= cutoff_time
             )
-            .order_by(OrderEvent.created_at.desc())
         )
         
-        events = result.scalars().all()
+        counts = (await db.execute(query)).one()
         
-        # Simple SLA breach detection logic
         breach_analysis = {
-            'total_events': len(events),
-            'breaches_detected': 0,
-            'breach_types': {},
-            'orders_affected': set()
+            'total_events': counts.total_events,
+            'breaches_detected': counts.breaches,
+            'breach_types': {'delivery_delay': counts.breaches} if counts.breaches else {},
+            'orders_affected': counts.orders_affected
         }
         
-        for event in events:
-            # Check for delivery delays (simple heuristic)
-            if event.event_type == 'order_created':
-                order_age_hours = (datetime.utcnow() - event.occurred_at).total_seconds() / 3600
-                
-                # SLA: Orders should be fulfilled within 72 hours
-                if order_age_hours > 72:
-                    breach_type = 'delivery_delay'
-                    breach_analysis['breaches_detected'] += 1
-                    breach_analysis['breach_types'][breach_type] = (
-                        breach_analysis['breach_types'].get(breach_type, 0) + 1
-                    )
-                    breach_analysis['orders_affected'].add(event.order_id)
-        
-        breach_analysis['orders_affected'] = len(breach_analysis['orders_affected'])
-        
         logger.info(f"Detected {breach_analysis['breaches_detected']} SLA breaches")
         return breach_analysis
 
@@ -346,15 +390,15 @@ async def generate_invoices_for_completed_orders(
     """
     Generate invoices for orders that have completed fulfillment.
     
-    This task identifies completed orders and generates invoices
-    for billing purposes.
+    This task identifies completed orders without an invoice and
+    enqueues them for the invoice generation worker.
     
     Args:
         tenant: Tenant to generate invoices for
         lookback_hours: How far back to look for completed orders
         
     Returns:
-        Dict with invoice generation results
+        Dict with invoice enqueue results
     """
     logger = get_run_logger()
     logger.info(f"Generating invoices for completed orders - tenant {tenant}")
@@ -363,67 +407,36 @@ async def generate_invoices_for_completed_orders(
     
     async with get_session() as db:
         # Get completed orders that don't have invoices yet
-        result = await db.execute(
-            select(OrderEvent)
-            .filter(
-                and_(
-                    OrderEvent.tenant == tenant,
-                    OrderEvent.event_type == 'order_fulfilled',
-                    OrderEvent.created_at >= cutoff_time
-                )
-            )
+        completed_orders = await list_order_events(
+            db, tenant, cutoff_time, event_types=('order_fulfilled',)
         )
         
-        completed_orders = result.scalars().all()
-        
-        invoice_service = InvoiceGeneratorService()
-        
-        invoice_results = {
-            'completed_orders': len(completed_orders),
-            'invoices_generated': 0,
-            'total_amount_cents': 0,
-            'errors': []
-        }
-        
-        for order in completed_orders:
-            try:
-                # Check if invoice already exists
-                existing_invoice = await db.execute(
-                    select(Invoice).filter(
-                        and_(
-                            Invoice.tenant == tenant,
-                            Invoice.order_id == order.order_id
-                        )
-                    )
+        # Orders that already have an invoice, fetched in one query
+        order_ids = [order.order_id for order in completed_orders]
+        invoiced_order_ids = set((await db.execute(
+            select(Invoice.order_id).where(
+                and_(
+                    Invoice.tenant == tenant,
+                    Invoice.order_id.in_(order_ids)
                 )
-                
-                if existing_invoice.scalar_one_or_none():
-                    continue  # Invoice already exists
-                
-                # Generate invoice (using synchronous method for now)
-                try:
-                    invoice_data = invoice_service.generate_invoice(
-                        tenant, order.order_id, order.payload
-                    )
-                    
-                    if invoice_data:
-                        invoice_results['invoices_generated'] += 1
-                        invoice_results['total_amount_cents'] += invoice_data.get('amount_cents', 0)
-                except AttributeError:
-                    # Fallback: create a simple invoice record
-                    logger.info(f"Creating simple invoice for order {order.order_id}")
-                    invoice_results['invoices_generated'] += 1
-                    invoice_results['total_amount_cents'] += 5000  # $50 default
-                    
-            except Exception as e:
-                logger.error(f"Error generating invoice for order {order.order_id}: {e}")
-                invoice_results['errors'].append({
-                    'order_id': order.order_id,
-                    'error': str(e)
-                })
-        
-        logger.info(f"Generated {invoice_results['invoices_generated']} invoices")
-        return invoice_results
+            )
+        )).scalars().all()) if order_ids else set()
+    
+    # Generation happens in the invoice worker; the pipeline only hands off
+    # the orders, so a slow invoice service never stalls it
+    pending_orders = [order for order in completed_orders if order.order_id not in invoiced_order_ids]
+    invoices_enqueued = await enqueue_many([
+        {'tenant': tenant, 'order_id': order.order_id} for order in pending_orders
+    ])
+    
+    invoice_results = {
+        'completed_orders': len(completed_orders),
+        'invoices_enqueued': invoices_enqueued,
+        'already_queued': len(pending_orders) - invoices_enqueued
+    }
+    
+    logger.info(f"Enqueued {invoices_enqueued} orders for invoice generation")
+    return invoice_results
 
 
 # ==== MAIN FLOW ==== #
@@ -447,7 +460,7 @@ async def order_processing_pipeline(
     1. Monitor order fulfillment progress
     2. Manage processing stages (if enabled)
     3. Detect SLA breaches
-    4. Generate invoices for completed orders
+    4. Enqueue completed orders for invoice generation
     
     Args:
         tenant: Tenant to process orders for
@@ -460,28 +473,45 @@ async def order_processing_pipeline(
     logger = get_run_logger()
     logger.info(f"Starting order processing pipeline for tenant {tenant}")
     
-    # Run all tasks concurrently where possible
-    fulfillment_task = monitor_order_fulfillment(tenant, lookback_hours)
-    sla_task = detect_sla_breaches(tenant, lookback_hours)
-    
-    # Processing stages task (optional)
-    if enable_processing_stages:
-        stages_task = manage_processing_stages(tenant, batch_size=25)
-    else:
-        stages_task = None
+    # Idle windows are common off-hours; one EXISTS probe skips all four tasks
+    cutoff_time = datetime.utcnow() - timedelta(hours=lookback_hours)
+    async with get_session() as db:
+        has_work = await db.scalar(
+            select(
+                exists().where(
+                    and_(
+                        OrderEvent.tenant == tenant,
+                        OrderEvent.created_at >= cutoff_time
+                    )
+                )
+            )
+        )
     
-    # Wait for monitoring tasks to complete
-    fulfillment_results = await fulfillment_task
-    sla_results = await sla_task
+    if not has_work:
+        logger.info(f"No order events in the last {lookback_hours}h for tenant {tenant}, skipping pipeline")
+        return {
+            'tenant': tenant,
+            'processing_time': datetime.utcnow().isoformat(),
+            'status': 'idle',
+            'summary': {
+                'orders_monitored': 0,
+                'stages_processed': 0 if enable_processing_stages else 'N/A',
+                'sla_breaches': 0,
+                'invoices_enqueued': 0
+            }
+        }
     
-    # Wait for processing stages if enabled
-    if stages_task:
-        stages_results = await stages_task
-    else:
-        stages_results = {'status': 'disabled'}
+    async def _stages_disabled() -> Dict[str, Any]:
+        return {'status': 'disabled'}
     
-    # Generate invoices for completed orders
-    invoice_results = await generate_invoices_for_completed_orders(tenant, lookback_hours)
+    # The four tasks read independent data over the same window, so run them
+    # concurrently; each opens its own sessions
+    fulfillment_results, stages_results, sla_results, invoice_results = await asyncio.gather(
+        monitor_order_fulfillment(tenant, lookback_hours),
+        manage_processing_stages(tenant, batch_size=25) if enable_processing_stages else _stages_disabled(),
+        detect_sla_breaches(tenant, lookback_hours),
+        generate_invoices_for_completed_orders(tenant, lookback_hours)
+    )
     
     # Compile comprehensive results
     pipeline_results = {
@@ -495,7 +525,7 @@ async def order_processing_pipeline(
             'orders_monitored': fulfillment_results.get('total_orders', 0),
             'stages_processed': stages_results.get('processed_stages', 0) if stages_results.get('status') != 'disabled' else 'N/A',
             'sla_breaches': sla_results.get('breaches_detected', 0),
-            'invoices_generated': invoice_results.get('invoices_generated', 0)
+            'invoices_enqueued': invoice_results.get('invoices_enqueued', 0)
         }
     }
     
@@ -503,6 +533,37 @@ async def order_processing_pipeline(
     return pipeline_results
 
 
+# ==== INVOICE WORKER FLOW ==== #
+
+
+@flow(
+    name="invoice_generation_worker",
+    description="Drain the invoice generation queue with bounded concurrency"
+)
+async def invoice_generation_worker(
+    consumer: str = "invoice-worker-1",
+    batch_size: int = 100
+) -> Dict[str, Any]:
+    """
+    Generate invoices for orders queued by the order processing pipeline.
+    
+    Args:
+        consumer: Consumer name within the worker group
+        batch_size: Maximum jobs to drain per run
+        
+    Returns:
+        Dict with generated, already invoiced, retried and dead-lettered counts
+    """
+    logger = get_run_logger()
+    
+    drain_results = await drain_invoice_queue(
+        consumer, batch_size=batch_size, concurrency=INVOICE_GENERATION_CONCURRENCY
+    )
+    
+    logger.info(f"Invoice worker drained {drain_results['jobs_read']} jobs: {drain_results}")
+    return drain_results
+
+
 # ==== DEPLOYMENT HELPER ==== #
 
 
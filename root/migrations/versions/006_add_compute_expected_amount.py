@@ -0,0 +1,108 @@
+"""Add compute_expected_amount SQL function
+
+Revision ID: 006
+Revises: 004
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Mirror app.services.billing.compute_amount_cents server-side."""
+    # Keep in sync with compute_amount_cents: each int() there is a trunc()
+    # here, applied in the same order to the same double-precision operands,
+    # and tariff values fall back to the same defaults
+    op.execute("""
+        CREATE OR REPLACE FUNCTION compute_expected_amount(ops jsonb, cfg jsonb)
+        RETURNS bigint
+        LANGUAGE plpgsql
+        IMMUTABLE
+        AS $$
+        DECLARE
+            total double precision;
+            storage_days double precision := COALESCE((ops->>'storage_days')::double precision, 0);
+            storage_rate double precision := COALESCE((cfg->>'storage_fee_cents_per_day')::double precision, 5);
+            long_term_days double precision := COALESCE((cfg->>'long_term_storage_days')::double precision, 90);
+            return_count double precision := COALESCE((ops->>'returns')::double precision, 0);
+            monthly_orders double precision := COALESCE((ops->>'monthly_order_count')::double precision, 0);
+        BEGIN
+            -- Core operation fees
+            total := COALESCE((ops->>'pick')::double precision, 0) * COALESCE((cfg->>'pick_fee_cents')::double precision, 30)
+                   + COALESCE((ops->>'pack')::double precision, 0) * COALESCE((cfg->>'pack_fee_cents')::double precision, 20)
+                   + COALESCE((ops->>'label')::double precision, 0) * COALESCE((cfg->>'label_fee_cents')::double precision, 15)
+                   + COALESCE((ops->>'kitting')::double precision, 0) * COALESCE((cfg->>'kitting_fee_cents')::double precision, 50);
+
+            -- Storage fees
+            IF storage_days > long_term_days THEN
+                total := total + long_term_days * storage_rate
+                       + trunc((storage_days - long_term_days) * storage_rate
+                               * COALESCE((cfg->>'long_term_storage_multiplier')::double precision, 2.0));
+            ELSIF storage_days > 0 THEN
+                total := total + storage_days * storage_rate;
+            END IF;
+
+            -- Value-added services
+            IF COALESCE((ops->>'photo')::boolean, false) THEN
+                total := total + COALESCE((cfg->>'photo_fee_cents')::double precision, 25);
+            END IF;
+            IF COALESCE((ops->>'quality_check')::boolean, false) THEN
+                total := total + COALESCE((cfg->>'quality_check_fee_cents')::double precision, 50);
+            END IF;
+            IF COALESCE((ops->>'custom_packaging')::boolean, false) THEN
+                total := total + COALESCE((cfg->>'custom_packaging_fee_cents')::double precision, 200);
+            END IF;
+            IF COALESCE((ops->>'gift_wrap')::boolean, false) THEN
+                total := total + COALESCE((cfg->>'gift_wrap_fee_cents')::double precision, 100);
+            END IF;
+
+            -- Return processing
+            IF return_count > 0 THEN
+                total := total + return_count * (
+                    COALESCE((cfg->>'return_processing_fee_cents')::double precision, 75)
+                    + COALESCE((cfg->>'restocking_fee_cents')::double precision, 150)
+                    + COALESCE((cfg->>'inspection_fee_cents')::double precision, 25)
+                );
+            END IF;
+
+            -- Minimum fee
+            total := GREATEST(total, COALESCE((cfg->>'min_order_fee_cents')::double precision, 50));
+
+            -- Special-handling multipliers, truncated after each one
+            IF COALESCE((ops->>'rush')::boolean, false) THEN
+                total := trunc(total * COALESCE((cfg->>'rush_multiplier')::double precision, 2.0));
+            END IF;
+            IF COALESCE((ops->>'oversized')::boolean, false) THEN
+                total := trunc(total * COALESCE((cfg->>'oversized_multiplier')::double precision, 1.5));
+            END IF;
+            IF COALESCE((ops->>'hazmat')::boolean, false) THEN
+                total := trunc(total * COALESCE((cfg->>'hazmat_multiplier')::double precision, 3.0));
+            END IF;
+            IF COALESCE((ops->>'fragile')::boolean, false) THEN
+                total := trunc(total * COALESCE((cfg->>'fragile_multiplier')::double precision, 1.2));
+            END IF;
+
+            -- Volume discounts
+            IF monthly_orders >= COALESCE((cfg->>'volume_tier_3_orders')::double precision, 1000) THEN
+                total := trunc(total * (1 - COALESCE((cfg->>'volume_tier_3_discount')::double precision, 0.15)));
+            ELSIF monthly_orders >= COALESCE((cfg->>'volume_tier_2_orders')::double precision, 500) THEN
+                total := trunc(total * (1 - COALESCE((cfg->>'volume_tier_2_discount')::double precision, 0.10)));
+            ELSIF monthly_orders >= COALESCE((cfg->>'volume_tier_1_orders')::double precision, 100) THEN
+                total := trunc(total * (1 - COALESCE((cfg->>'volume_tier_1_discount')::double precision, 0.05)));
+            END IF;
+
+            RETURN total::bigint;
+        END;
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    """Drop the server-side expected amount function."""
+    op.execute("DROP FUNCTION IF EXISTS compute_expected_amount(jsonb, jsonb)")
@@ -0,0 +1,43 @@
+"""Add invoice number sequences
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create per-tenant monthly invoice counters, seeded from issued numbers."""
+    op.create_table('invoice_sequences',
+        sa.Column('tenant', sa.String(length=64), nullable=False),
+        sa.Column('year_month', sa.String(length=6), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant'], ['tenants.name'], ),
+        sa.PrimaryKeyConstraint('tenant', 'year_month')
+    )
+    
+    # Continue numbering after invoices already issued as TENANT-YYYYMM-NNNN
+    op.execute("""
+        INSERT INTO invoice_sequences (tenant, year_month, last_value)
+        SELECT tenant,
+               substring(invoice_number FROM '-([0-9]{6})-[0-9]+$'),
+               MAX(CAST(substring(invoice_number FROM '[0-9]+$') AS INTEGER))
+        FROM invoices
+        WHERE invoice_number LIKE upper(tenant) || '-%'
+          AND invoice_number ~ '-[0-9]{6}-[0-9]+$'
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Drop invoice number counters."""
+    op.drop_table('invoice_sequences')
@@ -0,0 +1,37 @@
+"""Add billing lookup indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index the per-order invoice and active-exception lookups used by billing."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_invoices_tenant_order', 'invoices', ['tenant', 'order_id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_exceptions_tenant_order_active', 'exceptions', ['tenant', 'order_id'],
+            postgresql_where=sa.text("status IN ('OPEN', 'IN_PROGRESS')"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Drop billing lookup indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_exceptions_tenant_order_active', table_name='exceptions', postgresql_concurrently=True)
+        op.drop_index('ix_invoices_tenant_order', table_name='invoices', postgresql_concurrently=True)
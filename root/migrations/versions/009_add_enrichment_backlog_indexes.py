@@ -0,0 +1,38 @@
+"""Add enrichment backlog indexes
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Index the unenriched and low-confidence exception subsets per tenant."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_exceptions_tenant_missing_ai', 'exceptions', ['tenant'],
+            postgresql_where=sa.text("ai_confidence IS NULL"),
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_exceptions_tenant_low_confidence', 'exceptions', ['tenant'],
+            postgresql_where=sa.text("ai_confidence < 0.7 AND ai_confidence IS NOT NULL"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Drop enrichment backlog indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_exceptions_tenant_low_confidence', table_name='exceptions', postgresql_concurrently=True)
+        op.drop_index('ix_exceptions_tenant_missing_ai', table_name='exceptions', postgresql_concurrently=True)
@@ -0,0 +1,118 @@
+"""Add order status summary
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the hourly order status summary and keep it current on insert and delete."""
+    # fulfillment_status is Text: the key comes straight from the unvalidated
+    # payload and the insert trigger must never reject an ingest write
+    op.create_table(
+        'order_status_summary',
+        sa.Column('tenant', sa.String(length=64), sa.ForeignKey('tenants.name'), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('fulfillment_status', sa.Text(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('tenant', 'bucket_start', 'fulfillment_status')
+    )
+    
+    # Statement-level trigger so bulk ingest bumps each bucket once per
+    # statement rather than once per row
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_order_status_summary()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO order_status_summary (tenant, bucket_start, fulfillment_status, event_count)
+            SELECT tenant,
+                   date_trunc('hour', created_at),
+                   COALESCE(payload->>'fulfillment_status', 'unknown'),
+                   count(*)
+            FROM new_events
+            WHERE event_type IN ('order_created', 'order_updated')
+            GROUP BY 1, 2, 3
+            ON CONFLICT (tenant, bucket_start, fulfillment_status)
+            DO UPDATE SET event_count = order_status_summary.event_count + EXCLUDED.event_count;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER order_events_status_summary
+        AFTER INSERT ON order_events
+        REFERENCING NEW TABLE AS new_events
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION bump_order_status_summary();
+    """)
+    
+    # Deletes (reseeding, test cleanup) take their events back out; buckets
+    # that drop to zero are removed so they don't pin the tenant row
+    op.execute("""
+        CREATE OR REPLACE FUNCTION drop_order_status_summary()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE order_status_summary s
+            SET event_count = s.event_count - d.event_count
+            FROM (
+                SELECT tenant,
+                       date_trunc('hour', created_at) AS bucket_start,
+                       COALESCE(payload->>'fulfillment_status', 'unknown') AS fulfillment_status,
+                       count(*) AS event_count
+                FROM old_events
+                WHERE event_type IN ('order_created', 'order_updated')
+                GROUP BY 1, 2, 3
+            ) d
+            WHERE s.tenant = d.tenant
+              AND s.bucket_start = d.bucket_start
+              AND s.fulfillment_status = d.fulfillment_status;
+            
+            DELETE FROM order_status_summary s
+            USING (SELECT DISTINCT tenant FROM old_events) t
+            WHERE s.tenant = t.tenant AND s.event_count <= 0;
+            RETURN NULL;
+        END;
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER order_events_status_summary_delete
+        AFTER DELETE ON order_events
+        REFERENCING OLD TABLE AS old_events
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION drop_order_status_summary();
+    """)
+    
+    # Backfill from existing events
+    op.execute("""
+        INSERT INTO order_status_summary (tenant, bucket_start, fulfillment_status, event_count)
+        SELECT tenant,
+               date_trunc('hour', created_at),
+               COALESCE(payload->>'fulfillment_status', 'unknown'),
+               count(*)
+        FROM order_events
+        WHERE event_type IN ('order_created', 'order_updated')
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Drop the order status summary and its triggers."""
+    op.execute("DROP TRIGGER IF EXISTS order_events_status_summary_delete ON order_events")
+    op.execute("DROP FUNCTION IF EXISTS drop_order_status_summary()")
+    op.execute("DROP TRIGGER IF EXISTS order_events_status_summary ON order_events")
+    op.execute("DROP FUNCTION IF EXISTS bump_order_status_summary()")
+    op.drop_table('order_status_summary')
@@ -0,0 +1,79 @@
+"""Add order event covering index and unique invoice per order
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def _drop_if_invalid(index_name: str) -> None:
+    """Drop an index left INVALID by an earlier failed CONCURRENTLY build."""
+    invalid = op.get_bind().execute(
+        sa.text("""
+            SELECT 1 FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """),
+        {"name": index_name}
+    ).first()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+
+def upgrade() -> None:
+    """Cover the order flow's event-type window scans and enforce one invoice per order."""
+    # Invoices used to be deduplicated by a check-then-insert, which could
+    # race; refuse to proceed rather than pick which duplicate to delete
+    duplicate_orders = op.get_bind().execute(sa.text("""
+        SELECT count(*) FROM (
+            SELECT 1 FROM invoices GROUP BY tenant, order_id HAVING count(*) > 1
+        ) duplicates
+    """)).scalar_one()
+    if duplicate_orders:
+        raise RuntimeError(
+            f"{duplicate_orders} (tenant, order_id) pairs have more than one invoice; "
+            "resolve the duplicates before adding uq_invoices_tenant_order"
+        )
+    
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        _drop_if_invalid('ix_order_events_tenant_type_created')
+        op.create_index(
+            'ix_order_events_tenant_type_created', 'order_events',
+            ['tenant', 'event_type', 'created_at'],
+            postgresql_include=['order_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        _drop_if_invalid('uq_invoices_tenant_order')
+        op.create_index(
+            'uq_invoices_tenant_order', 'invoices', ['tenant', 'order_id'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        # The unique index serves every lookup the plain one did
+        op.drop_index(
+            'ix_invoices_tenant_order', table_name='invoices',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Restore the plain invoice lookup index and drop the covering index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_invoices_tenant_order', 'invoices', ['tenant', 'order_id'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('uq_invoices_tenant_order', table_name='invoices', postgresql_concurrently=True)
+        op.drop_index('ix_order_events_tenant_type_created', table_name='order_events', postgresql_concurrently=True)
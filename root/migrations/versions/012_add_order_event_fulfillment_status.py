@@ -0,0 +1,36 @@
+"""Add generated fulfillment_status column to order events
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store fulfillment_status as a column computed from the event payload."""
+    # A stored generated column is filled for existing rows by the ALTER
+    # and kept in sync on every insert, so ingest paths need no changes.
+    # Text rather than a bounded varchar: the payload is unvalidated and a
+    # length cast here would reject the whole event insert
+    op.add_column(
+        'order_events',
+        sa.Column(
+            'fulfillment_status', sa.Text(),
+            sa.Computed("payload->>'fulfillment_status'", persisted=True),
+            nullable=True
+        )
+    )
+
+
+def downgrade() -> None:
+    """Drop the generated fulfillment_status column."""
+    op.drop_column('order_events', 'fulfillment_status')
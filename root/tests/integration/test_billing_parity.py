@@ -0,0 +1,52 @@
+"""Integration tests for server-side and Python tariff parity."""
+
+import json
+
+import pytest
+from sqlalchemy import text
+from unittest.mock import patch
+
+from app.services.billing import compute_amount_cents
+
+
+# Operation sets exercising every truncation step of the tariff
+_PARITY_CASES = [
+    {"pick": picks, **flags, "monthly_order_count": monthly}
+    for picks in (0, 1, 2, 7, 33, 166)
+    for flags in (
+        {},
+        {"hazmat": True, "fragile": True},
+        {"rush": True, "oversized": True},
+        {"rush": True, "oversized": True, "hazmat": True, "fragile": True}
+    )
+    for monthly in (0, 150, 600, 1200)
+] + [
+    {"pick": 3, "storage_days": 95},
+    {"pack": 2, "storage_days": 120, "fragile": True},
+    {"label": 1, "returns": 2, "gift_wrap": True, "rush": True}
+]
+
+
+@pytest.mark.integration
+@pytest.mark.postgres
+class TestComputeExpectedAmountParity:
+    """Test compute_expected_amount (migration 006) matches compute_amount_cents."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("operations", _PARITY_CASES)
+    @patch('app.services.billing.get_billing_config', return_value={})
+    async def test_sql_matches_python(self, mock_config, operations, db_session):
+        """Test the server-side tariff agrees with the Python tariff."""
+        # The test schema comes from init_database(), not the migrations
+        function_exists = await db_session.scalar(
+            text("SELECT to_regproc('compute_expected_amount') IS NOT NULL")
+        )
+        if not function_exists:
+            pytest.skip("compute_expected_amount not installed; run migration 006")
+        
+        sql_amount = await db_session.scalar(
+            text("SELECT compute_expected_amount(CAST(:ops AS jsonb), CAST('{}' AS jsonb))"),
+            {"ops": json.dumps(operations)}
+        )
+        
+        assert sql_amount == compute_amount_cents(operations, "test-tenant")
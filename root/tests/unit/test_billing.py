@@ -375,3 +375,73 @@ class TestBillingIntegrationWithFlows:
         # Custom rates: 50 + 30 + 20 = 100
         assert amount == 100
         mock_config.assert_called_once_with("custom-tenant")
+
+    @patch('app.services.billing.get_billing_config')
+    def test_compute_amount_truncates_after_each_multiplier(self, mock_config):
+        """Test special-handling multipliers truncate to cents one at a time."""
+        mock_config.return_value = {}
+        
+        operations = {"pick": 1, "hazmat": True, "fragile": True}
+        
+        amount = compute_amount_cents(operations, "test-tenant")
+        
+        # Minimum fee 50 -> hazmat int(50 * 3.0) = 150 -> fragile int(150 * 1.2) = 180;
+        # a single product would give int(50 * 3.5999...) = 179
+        assert amount == 180
+
+    @patch('app.services.billing.get_billing_config')
+    def test_compute_amount_all_multipliers_match_sequential_truncation(self, mock_config):
+        """Test stacked multipliers against step-by-step truncation."""
+        mock_config.return_value = {}
+        
+        for pick_count in range(1, 200):
+            operations = {
+                "pick": pick_count,
+                "rush": True,
+                "oversized": True,
+                "hazmat": True,
+                "fragile": True
+            }
+            
+            expected = max(pick_count * 30, 50)
+            for multiplier in (2.0, 1.5, 3.0, 1.2):
+                expected = int(expected * multiplier)
+            
+            assert compute_amount_cents(operations, "test-tenant") == expected
+
+
+@pytest.mark.unit
+class TestTariffAdjustmentFallback:
+    """Test the non-PostgreSQL tariff adjustment path against compute_amount_cents."""
+    
+    @pytest.mark.asyncio
+    @patch('app.services.billing.bulk_insert_adjustments', new_callable=AsyncMock)
+    @patch('app.services.billing.get_billing_config', return_value={})
+    async def test_no_adjustment_when_amount_matches_sequential_truncation(
+        self, mock_config, mock_bulk_insert
+    ):
+        """Test an invoice billed with per-multiplier truncation is left alone."""
+        from types import SimpleNamespace
+        
+        mock_db = AsyncMock()
+        mock_db.connection.return_value = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+        mock_db.execute.return_value = [
+            SimpleNamespace(
+                id=1,
+                tenant="test-tenant",
+                billable_ops={"pick": 1, "hazmat": True, "fragile": True},
+                amount_cents=180
+            ),
+            SimpleNamespace(
+                id=2,
+                tenant="test-tenant",
+                billable_ops={"pick": 1, "hazmat": True, "fragile": True},
+                amount_cents=179
+            )
+        ]
+        
+        result = await BillingService().generate_tariff_adjustments(mock_db, "test-tenant")
+        
+        assert result == {"adjustments_created": 1, "total_adjustment_cents": 1}
+        rows = mock_bulk_insert.call_args.args[1]
+        assert [row["invoice_id"] for row in rows] == [2]
@@ -0,0 +1,154 @@
+"""Unit tests for the background invoice generation queue."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import invoice_queue
+from app.services.invoice_queue import (
+    INVOICE_MAX_ATTEMPTS,
+    INVOICE_QUEUE_STREAM,
+    drain_invoice_queue,
+    enqueue_many
+)
+
+
+class FakePipeline:
+    """Records queued Redis commands and returns canned execute() results."""
+
+    def __init__(self, results=None):
+        self.commands = []
+        self.results = results or []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        return self.results
+
+    def calls(self, name):
+        return [args for command, args, _ in self.commands if command == name]
+
+
+def _redis_client(pipelines, entries=()):
+    """Build a Redis client mock handing out the given pipelines in order."""
+    client = MagicMock()
+    client.pipeline.side_effect = list(pipelines)
+    client.xgroup_create = AsyncMock()
+    client.xreadgroup = AsyncMock(
+        return_value=[[INVOICE_QUEUE_STREAM, list(entries)]] if entries else []
+    )
+    return client
+
+
+def _job(order_id, attempts=0):
+    return {"tenant": "test-tenant", "order_id": order_id, "attempts": str(attempts)}
+
+
+@pytest.mark.unit
+class TestEnqueueMany:
+    """Test cases for enqueueing invoice jobs."""
+
+    @pytest.mark.asyncio
+    async def test_only_unclaimed_orders_are_streamed(self):
+        """Test orders whose dedupe key is already held are not queued again."""
+        claim = FakePipeline(results=[True, None, True])
+        stream = FakePipeline()
+        client = _redis_client([claim, stream])
+
+        with patch.object(invoice_queue, "get_redis_client", AsyncMock(return_value=client)):
+            enqueued = await enqueue_many([
+                {"tenant": "test-tenant", "order_id": order_id}
+                for order_id in ("order-1", "order-2", "order-3")
+            ])
+
+        assert enqueued == 2
+        assert [args[1]["order_id"] for args in stream.calls("xadd")] == ["order-1", "order-3"]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_redis(self):
+        """Test enqueueing nothing makes no Redis calls."""
+        get_client = AsyncMock()
+
+        with patch.object(invoice_queue, "get_redis_client", get_client):
+            assert await enqueue_many([]) == 0
+
+        get_client.assert_not_called()
+
+
+@pytest.mark.unit
+class TestDrainInvoiceQueue:
+    """Test cases for the invoice queue worker."""
+
+    async def _drain(self, entries, ensure_invoice):
+        pipe = FakePipeline()
+        client = _redis_client([pipe], entries)
+        generator = MagicMock()
+        generator.ensure_invoice = ensure_invoice
+
+        with patch.object(invoice_queue, "get_redis_client", AsyncMock(return_value=client)), \
+             patch.object(invoice_queue, "get_invoice_generator", return_value=generator), \
+             patch.object(invoice_queue, "get_session") as mock_session, \
+             patch.object(invoice_queue, "push_dlq", new_callable=AsyncMock) as mock_push_dlq:
+            mock_session.return_value.__aenter__.return_value = AsyncMock()
+            results = await drain_invoice_queue("worker-1")
+
+        return results, pipe, mock_push_dlq
+
+    @pytest.mark.asyncio
+    async def test_created_and_existing_invoices_are_counted_separately(self):
+        """Test invoices found already in place do not count as generated."""
+        ensure_invoice = AsyncMock(side_effect=[
+            (MagicMock(amount_cents=180), True),
+            (MagicMock(amount_cents=950), False)
+        ])
+
+        results, pipe, mock_push_dlq = await self._drain(
+            [("1-0", _job("order-1")), ("2-0", _job("order-2"))], ensure_invoice
+        )
+
+        assert results["invoices_generated"] == 1
+        assert results["already_invoiced"] == 1
+        assert results["total_amount_cents"] == 180
+        assert len(pipe.calls("xack")) == 2
+        assert len(pipe.calls("delete")) == 2
+        mock_push_dlq.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_is_requeued_with_attempt_count(self):
+        """Test a failure below the attempt limit goes back on the stream."""
+        ensure_invoice = AsyncMock(side_effect=ValueError("No events found for order order-1"))
+
+        results, pipe, mock_push_dlq = await self._drain(
+            [("1-0", _job("order-1"))], ensure_invoice
+        )
+
+        assert results["retried"] == 1
+        assert results["invoices_generated"] == 0
+        (stream, fields), = pipe.calls("xadd")
+        assert fields["attempts"] == 1
+        assert pipe.calls("expire")
+        assert not pipe.calls("delete")
+        mock_push_dlq.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_exhausted_job_is_dead_lettered_and_released(self):
+        """Test the last failed attempt goes to the DLQ and frees the dedupe key."""
+        ensure_invoice = AsyncMock(side_effect=RuntimeError("database unavailable"))
+
+        results, pipe, mock_push_dlq = await self._drain(
+            [("1-0", _job("order-1", attempts=INVOICE_MAX_ATTEMPTS - 1))], ensure_invoice
+        )
+
+        assert results["dead_lettered"] == 1
+        assert not pipe.calls("xadd")
+        assert pipe.calls("delete") == [("invoice_queue:test-tenant:order-1",)]
+        assert mock_push_dlq.call_args.kwargs["error_class"] == "RuntimeError"
+        assert mock_push_dlq.call_args.kwargs["source_operation"] == "invoice_generation"